@@ -0,0 +1,18 @@
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brewers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='brewer',
+            index=django.contrib.postgres.indexes.GistIndex(django.db.models.functions.comparison.Cast('location', output_field=django.contrib.gis.db.models.fields.PointField(geography=True, srid=4326)), name='brewer_geog_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GistIndex
 from phonenumber_field.modelfields import PhoneNumberField
+from common.gis import as_geography
 from common.models import CommonInfo
 
 
@@ -13,6 +15,11 @@ class Brewer(CommonInfo):
     phone_number = PhoneNumberField()
     can_claim = models.BooleanField(default=True)  ## Brewer makes claim, cant again until review
 
+    class Meta:
+        indexes = [
+            GistIndex(as_geography("location"), name="brewer_geog_idx"),  ## Meter-based search
+        ]
+
     @property
     def location_str(self):
         return str(self.location)
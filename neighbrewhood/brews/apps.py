@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BrewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'brews'
+
+    def ready(self):
+        from . import lookups, signals  # noqa: F401  Registers the signal receivers
@@ -0,0 +1,6 @@
+from common.lookups import LookupTable
+from .models import BrewType, Quality
+
+
+brew_types = LookupTable(BrewType)
+qualities = LookupTable(Quality)
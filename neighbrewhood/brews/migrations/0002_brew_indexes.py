@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='brew',
+            index=models.Index(fields=['-created', '-id'], name='brew_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brew',
+            index=models.Index(fields=['creator', '-created', '-id'], name='brew_creator_created_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_search_vector(apps, schema_editor):
+    Brew = apps.get_model("brews", "Brew")
+    BrewType = apps.get_model("brews", "BrewType")
+    Quality = apps.get_model("brews", "Quality")
+    brew_type = BrewType.objects.filter(pk=OuterRef("brew_type_id")).values("value")
+    qualities = (
+        Quality.objects.filter(brew=OuterRef("pk"))
+        .values("brew")
+        .annotate(names=StringAgg("value", " "))
+        .values("names")
+    )
+    Brew.objects.update(
+        search_vector=SearchVector(Subquery(brew_type), weight="A", config="english")
+        + SearchVector(Subquery(qualities), weight="A", config="english")
+        + SearchVector("notes", weight="B", config="english")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brews', '0002_brew_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brew',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='brew',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='brew_search_idx'),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,16 @@
 from typing import Any
-from django.db import models
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast
 from common.models import CommonInfo
 
 
+SEARCH_CONFIG = "english"
+
+
 class Quality(CommonInfo):
     value = models.CharField(max_length=31)
 
@@ -17,12 +25,153 @@ class BrewType(CommonInfo):
         return self.value
 
 
+def search_vector_expression():
+    """
+    The search document of the brew in the current row: brew type and quality names
+    (weighted A) and notes (B). Built from subqueries so it can be used in an UPDATE.
+    """
+    brew_type = BrewType.objects.filter(pk=OuterRef("brew_type_id")).values("value")
+    qualities = (
+        Quality.objects.filter(brew=OuterRef("pk"))
+        .values("brew")
+        .annotate(names=StringAgg("value", " "))
+        .values("names")
+    )
+    return (
+        SearchVector(Subquery(brew_type), weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Subquery(qualities), weight="A", config=SEARCH_CONFIG)
+        + SearchVector("notes", weight="B", config=SEARCH_CONFIG)
+    )
+
+
+class BrewQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Load everything BrewResponseSchema reads, so a page serializes without further queries."""
+        return self.select_related("brew_type", "creator").prefetch_related("qualities")
+
+    def refresh_search_vector(self):
+        """Recompute ``search_vector`` for these brews with a single UPDATE."""
+        return self.update(search_vector=search_vector_expression())
+
+    def search(self, text=None, brew_type=None, qualities=(), start_date=(None, None), completion_date=(None, None)):
+        """
+        Brews matching every given filter, annotated with ``rank`` (0 without ``text``).
+        ``text`` uses web search syntax against the GIN-indexed ``search_vector``; a brew
+        must have all ``qualities``; the date filters are inclusive ``(after, before)``
+        pairs, either end optional.
+        """
+        query = self
+        if text:
+            search_query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+            # ts_rank returns real; as double precision the rank round-trips through keyset cursors
+            rank = Cast(SearchRank(F("search_vector"), search_query), FloatField())
+            query = query.filter(search_vector=search_query).annotate(rank=rank)
+        else:
+            query = query.annotate(rank=Value(0.0, output_field=FloatField()))
+        if brew_type is not None:
+            query = query.filter(brew_type_id=brew_type)
+        Through = self.model.qualities.through
+        for quality in set(qualities):
+            # A subquery per quality rather than a join, so facets still count every quality
+            query = query.filter(id__in=Through.objects.filter(quality_id=quality).values("brew_id"))
+        for field, (after, before) in (("start_date", start_date), ("completion_date", completion_date)):
+            if after is not None:
+                query = query.filter(**{f"{field}__gte": after})
+            if before is not None:
+                query = query.filter(**{f"{field}__lte": before})
+        return query
+
+    def facets(self):
+        """
+        Brew counts per brew type and per quality over these brews, from one grouped query.
+        Returns ``{"brew_type": [...], "qualities": [...]}`` of ``{"id", "value", "count"}``,
+        largest first.
+        """
+        matches = self.model.objects.filter(id__in=self.values("id"))
+
+        def grouped(facet, path):
+            return (
+                matches.annotate(facet=Value(facet), facet_id=F(f"{path}__id"), facet_value=F(f"{path}__value"))
+                .filter(facet_id__isnull=False)
+                .values("facet", "facet_id", "facet_value")
+                .annotate(count=Count("id", distinct=True))
+                .order_by()
+            )
+
+        facets = {"brew_type": [], "qualities": []}
+        rows = grouped("brew_type", "brew_type").union(grouped("qualities", "qualities"), all=True)
+        for row in rows:
+            facets[row["facet"]].append({"id": row["facet_id"], "value": row["facet_value"], "count": row["count"]})
+        for counts in facets.values():
+            counts.sort(key=lambda facet: (-facet["count"], facet["value"]))
+        return facets
+
+    def bulk_create_brews(self, creator, items, atomic=True):
+        """
+        Create one Brew per dict in ``items`` (BrewCreateSchema fields) with a single INSERT
+        for the brews and one for their qualities. Brew types and qualities are resolved
+        from the lookup tables, so validation doesn't query per item.
+
+        With ``atomic`` nothing is created if any item is invalid; otherwise the valid items
+        are created and the rest reported. Returns ``(brews, errors)``: ``brews`` has the
+        created Brew or None per item, ``errors`` maps item index to a message.
+        """
+        from .lookups import brew_types, qualities
+
+        brews = [None] * len(items)
+        item_qualities = {}
+        errors = {}
+        for i, item in enumerate(items):
+            brew_type = brew_types.get(item["brew_type"])
+            if brew_type is None:
+                errors[i] = f"Brew type with id {item['brew_type']} does not exist"
+                continue
+            found, missing = qualities.in_bulk(list(dict.fromkeys(item["qualities"])))
+            if missing:
+                errors[i] = f"Qualities with ids {missing} do not exist"
+                continue
+            brews[i] = self.model(
+                brew_type=brew_type,
+                start_date=item.get("start_date"),
+                completion_date=item.get("completion_date"),
+                notes=item.get("notes"),
+                creator=creator,
+            )
+            item_qualities[i] = found
+
+        if atomic and errors:
+            return [None] * len(items), errors
+
+        with transaction.atomic():
+            self.bulk_create([brew for brew in brews if brew is not None])
+            Through = self.model.qualities.through
+            Through.objects.bulk_create([
+                Through(brew_id=brews[i].id, quality_id=quality.id)
+                for i, found in item_qualities.items()
+                for quality in found
+            ])
+            self.filter(id__in=[brew.id for brew in brews if brew is not None]).refresh_search_vector()
+        return brews, errors
+
+
 class Brew(CommonInfo):
+    MAX_BULK_CREATE = 500
+
     brew_type = models.ForeignKey(BrewType, on_delete=models.CASCADE)
     qualities = models.ManyToManyField(Quality)
     start_date = models.DateField(blank=True, null=True)
     completion_date = models.DateField(blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)  ## Kept in step by brews.signals
+
+    objects = BrewQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created", "-id"], name="brew_created_idx"),  ## brews
+            models.Index(fields=["creator", "-created", "-id"], name="brew_creator_created_idx"),  ## myBrews
+            GinIndex(fields=["search_vector"], name="brew_search_idx"),  ## search
+        ]
     
     @property
     def brewer(self):
@@ -0,0 +1,41 @@
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Brew, BrewType, Quality, search_vector_expression
+
+
+SEARCHED_FIELDS = {"brew_type", "brew_type_id", "notes"}
+
+
+@receiver(m2m_changed, sender=Brew.qualities.through)
+def touch_brew_on_qualities_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Changing qualities doesn't save the brew, so bump ``updated`` for conditional GETs and
+    rebuild the search vector, which includes the quality names.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        brews = Brew.objects.filter(pk=instance.pk)
+    elif pk_set:
+        brews = Brew.objects.filter(pk__in=pk_set)
+    else:
+        return
+    brews.update(updated=timezone.now(), search_vector=search_vector_expression())
+
+
+@receiver(post_save, sender=Brew)
+def refresh_brew_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCHED_FIELDS & set(update_fields):
+        return
+    Brew.objects.filter(pk=instance.pk).refresh_search_vector()
+
+
+@receiver(post_save, sender=BrewType)
+@receiver(post_save, sender=Quality)
+def refresh_renamed_lookup(sender, instance, created, **kwargs):
+    if created:
+        return  # No brews use it yet
+    lookup = "brew_type" if sender is BrewType else "qualities"
+    Brew.objects.filter(**{lookup: instance}).refresh_search_vector()
@@ -0,0 +1,63 @@
+import random
+import time
+
+from django.contrib.gis.measure import D
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from brewswaps.models import RANK_CANDIDATES, BrewSwap, BrewSwapStatusChoices
+from common.benchmark import random_point, seed_brewers, seed_scores, seed_swaps, summarize, time_calls
+from ratings.models import BrewerScore
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic live swaps and report nearby-search latency per radius, ordered by "
+        "distance and ranked. Seeded rows are rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--swaps", type=int, default=100_000)
+        parser.add_argument("--brewers", type=int, default=5_000)
+        parser.add_argument("--radii", type=int, nargs="+", default=[5, 20, 50], help="Search radii in miles")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--candidates", type=int, default=RANK_CANDIDATES, help="Candidates per ranked search")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true", help="Commit the seeded rows")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            start = time.perf_counter()
+            brewers = seed_brewers(rng, options["brewers"], prefix=f"bench_nearby_{int(time.time())}")
+            seed_swaps(rng, brewers, options["swaps"])
+            seed_scores(rng, brewers)
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {BrewSwap._meta.db_table}")
+                cursor.execute(f"ANALYZE {BrewerScore._meta.db_table}")
+            self.stdout.write(f"Seeded {options['swaps']} swaps in {time.perf_counter() - start:.1f}s")
+
+            page_size = options["page_size"]
+            for radius in options["radii"]:
+                def search():
+                    center = random_point(rng)
+                    query = BrewSwap.objects.filter(status=BrewSwapStatusChoices.LIVE)
+                    query = query.nearby(center, D(mi=radius)).for_listing().order_by("distance", "id")
+                    return list(query[:page_size])
+
+                def ranked_search():
+                    center = random_point(rng)
+                    query = BrewSwap.objects.filter(status=BrewSwapStatusChoices.LIVE)
+                    query = query.ranked_nearby(center, D(mi=radius), options["candidates"])
+                    return list(query.for_listing().order_by("-rank", "id")[:page_size])
+
+                for mode, fn in (("distance", search), ("ranked", ranked_search)):
+                    stats = summarize(time_calls(fn, options["iterations"]))
+                    self.stdout.write(
+                        f"{radius:>4} mi  {mode:<8}  p50 {stats['p50_ms']:7.2f} ms  "
+                        f"p99 {stats['p99_ms']:7.2f} ms  (n={stats['n']})"
+                    )
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
@@ -0,0 +1,56 @@
+import random
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse_lazy
+
+from brewswaps.models import BrewSwap
+from common.benchmark import seed_brewers, seed_swaps, summarize, time_calls
+from services.swapservice import schemas
+from services.swapservice.schemas import BrewSwapDetailResponseSchema
+
+
+class ReverseLazyUrls:
+    """The per-row ``reverse_lazy`` the swap schemas used before url_templates."""
+
+    def url(self, name, *args):
+        return str(reverse_lazy(name, args=args))
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize a page of swaps with BrewSwapDetailResponseSchema, resolving action URLs with "
+        "per-row reverse_lazy and with url_templates. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--swaps", type=int, default=1_000)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            brewers = seed_brewers(rng, 50, prefix=f"bench_serialize_{int(time.time())}")
+            seed_swaps(rng, brewers, options["swaps"])
+            swaps = list(BrewSwap.objects.for_listing().order_by("id")[:options["swaps"]])
+            # The viewer owns some of the swaps, so both branches of resolve_actions are timed
+            context = {"request": SimpleNamespace(user=swaps[0].creator)}
+
+            def serialize():
+                return [BrewSwapDetailResponseSchema.from_orm(swap, context=context).dict() for swap in swaps]
+
+            with mock.patch.object(schemas, "url_templates", ReverseLazyUrls()):
+                before = summarize(time_calls(serialize, options["iterations"]))
+            serialize()  # Build the templates outside the timings
+            after = summarize(time_calls(serialize, options["iterations"]))
+
+            for label, stats in (("reverse_lazy", before), ("url_templates", after)):
+                self.stdout.write(
+                    f"{label:>14}  {len(swaps)} swaps  p50 {stats['p50_ms']:8.2f} ms  "
+                    f"p99 {stats['p99_ms']:8.2f} ms  (n={stats['n']})"
+                )
+            transaction.set_rollback(True)
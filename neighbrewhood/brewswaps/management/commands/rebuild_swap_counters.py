@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from brewswaps.models import BrewSwap
+
+
+class Command(BaseCommand):
+    help = "Rebuild BrewSwap.accepted_bottles from the claim table, or just check it with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Report swaps whose counter disagrees with their accepted claims and exit non-zero.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = list(
+                BrewSwap.objects.with_claimed_bottles()
+                .exclude(accepted_bottles=F("claimed_bottles"))
+                .select_for_update()
+                .values_list("id", "accepted_bottles", "claimed_bottles")
+            )
+            for swap_id, stored, actual in drifted:
+                self.stdout.write(f"Swap {swap_id}: counter {stored}, claims {actual}")
+
+            if options["check"]:
+                if drifted:
+                    raise CommandError(f"{len(drifted)} swap counter(s) out of sync")
+                self.stdout.write(self.style.SUCCESS("All swap counters in sync"))
+                return
+
+            for swap_id, _, actual in drifted:
+                BrewSwap.objects.filter(id=swap_id).update(accepted_bottles=actual)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(drifted)} swap counter(s)"))
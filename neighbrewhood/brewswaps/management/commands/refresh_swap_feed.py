@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from brewswaps.models import SwapFeedRow
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every swap feed row from the swaps. Signals keep the feed current; run this "
+        "periodically to repair drift from bulk writes, and once after migrating."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            written = SwapFeedRow.objects.refresh(batch_size=options["batch_size"])
+        self.stdout.write(f"Refreshed {written} swap feed rows in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_accepted_bottles(apps, schema_editor):
+    BrewSwap = apps.get_model("brewswaps", "BrewSwap")
+    SwapClaim = apps.get_model("brewswaps", "SwapClaim")
+    accepted = (
+        SwapClaim.objects.filter(swap=OuterRef("pk"), status="Accepted")
+        .values("swap")
+        .annotate(total=Sum("num_bottles"))
+        .values("total")
+    )
+    BrewSwap.objects.update(accepted_bottles=Coalesce(Subquery(accepted), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brewswaps', '0003_alter_swapclaim_swap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brewswap',
+            name='accepted_bottles',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_accepted_bottles, migrations.RunPython.noop),
+    ]
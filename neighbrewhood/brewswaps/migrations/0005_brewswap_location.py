@@ -0,0 +1,27 @@
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_location(apps, schema_editor):
+    BrewSwap = apps.get_model("brewswaps", "BrewSwap")
+    Brewer = apps.get_model("brewers", "Brewer")
+    brewer_location = Brewer.objects.filter(user=OuterRef("creator")).values("location")[:1]
+    BrewSwap.objects.update(location=Subquery(brewer_location))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brewers', '0001_initial'),
+        ('brewswaps', '0004_brewswap_accepted_bottles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brewswap',
+            name='location',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, srid=4326),
+        ),
+        migrations.RunPython(backfill_location, migrations.RunPython.noop),
+    ]
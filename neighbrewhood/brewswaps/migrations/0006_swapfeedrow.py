@@ -0,0 +1,30 @@
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brewswaps', '0005_brewswap_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SwapFeedRow',
+            fields=[
+                ('swap', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_row', serialize=False, to='brewswaps.brewswap')),
+                ('status', models.TextField(choices=[('Live', 'Live'), ('Complete', 'Complete'), ('Inactive', 'Inactive')])),
+                ('total_bottles', models.IntegerField()),
+                ('max_increment', models.IntegerField()),
+                ('bottles_available', models.IntegerField()),
+                ('claims_count', models.IntegerField()),
+                ('created', models.DateTimeField()),
+                ('brew', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('creator', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created', '-swap'], name='swapfeed_created_idx'), models.Index(fields=['status', '-created', '-swap'], name='swapfeed_status_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brewswaps', '0006_swapfeedrow'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='brewswap',
+            index=models.Index(fields=['-created', '-id'], name='brewswap_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brewswap',
+            index=models.Index(fields=['creator', '-created', '-id'], name='brewswap_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brewswap',
+            index=django.contrib.postgres.indexes.GistIndex(condition=models.Q(('status', 'Live')), fields=['location'], name='brewswap_live_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swapclaim',
+            index=models.Index(fields=['swap', 'status'], name='swapclaim_swap_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swapclaim',
+            index=models.Index(condition=models.Q(('status', 'Accepted')), fields=['swap'], include=('num_bottles',), name='swapclaim_accepted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swapclaim',
+            index=models.Index(fields=['creator', '-created', '-id'], name='swapclaim_creator_created_idx'),
+        ),
+    ]
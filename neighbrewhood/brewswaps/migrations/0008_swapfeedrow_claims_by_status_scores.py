@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brewswaps', '0007_brewswap_swapclaim_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='swapfeedrow',
+            name='claims_by_status',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='swapfeedrow',
+            name='creator_score',
+            field=models.JSONField(null=True),
+        ),
+        migrations.AddField(
+            model_name='swapfeedrow',
+            name='brew_score',
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -1,6 +1,19 @@
-from django.db import models
+from datetime import datetime
+from itertools import islice
 
+from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GistIndex
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Extract, Least
+from django.db.models.query import ModelIterable
+from django.utils import timezone
+
+from brewers.models import Brewer
 from brews.models import Brew
+from common.gis import KNNDistance, as_wgs84
 from common.models import CommonInfo
 
 
@@ -16,21 +29,159 @@ class ClaimStatusChoices(models.TextChoices):
     REJECTED = "Rejected"
     CANCELED = "Canceled"
 
+
+## Ranked nearby search. Each component is scaled to roughly 0..1 and weighted.
+RANK_CANDIDATES = 500  ## Nearest swaps considered for ranking
+RANK_WEIGHTS = {
+    "proximity": 0.4,  ## 1 at the search point, 0 at the edge of the radius
+    "freshness": 0.25,  ## Drops by 1 for every RANK_FRESHNESS_DAYS of age
+    "availability": 0.15,  ## Bottles available, saturating at RANK_FULL_AVAILABILITY
+    "reputation": 0.2,  ## The creator's BrewerScore
+}
+RANK_FRESHNESS_DAYS = 14
+## Swaps created at RANK_FRESHNESS_EPOCH have freshness 0. Fixed for good: changing it would shift every
+## rank and strand the rank cursors clients already hold.
+RANK_FRESHNESS_EPOCH = datetime.fromisoformat("2026-10-01T00:00:00+00:00")
+RANK_FULL_AVAILABILITY = 24
+RANK_UNRATED_SCORE = 0.3  ## Reputation of creators nobody has rated yet
+
+
+def claims_by_status(swap_ids):
+    """``{swap_id: {status: count}}`` for ``swap_ids`` from one GROUP BY swap, status query."""
+    summary = {swap_id: dict.fromkeys(ClaimStatusChoices.values, 0) for swap_id in swap_ids}
+    if summary:
+        rows = (
+            SwapClaim.objects.filter(swap_id__in=summary)
+            .values_list("swap_id", "status")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for swap_id, status, count in rows:
+            summary[swap_id][status] = count
+    return summary
+
+
+class ClaimSummaryIterable(ModelIterable):
+    """
+    Sets ``claims_by_status`` on every fetched swap with one extra query for the whole
+    result, like a prefetch, so a page costs the same whatever its size. Under
+    ``.iterator(chunk_size)`` it takes one query per chunk instead, so rows still stream.
+    """
+    def __iter__(self):
+        swaps = super().__iter__()
+        chunk_size = self.chunk_size if self.chunked_fetch else None
+        while chunk := list(islice(swaps, chunk_size)):
+            summary = claims_by_status([swap.id for swap in chunk])
+            for swap in chunk:
+                swap.claims_by_status = summary[swap.id]
+            yield from chunk
+            if chunk_size is None:
+                return
+
+
+class BrewSwapQuerySet(models.QuerySet):
+    def with_claimed_bottles(self):
+        """Annotate ``claimed_bottles``, summed straight from the accepted claims."""
+        accepted = (
+            SwapClaim.objects.filter(swap=OuterRef("pk"), status=ClaimStatusChoices.ACCEPTED)
+            .values("swap")
+            .annotate(total=Sum("num_bottles"))
+            .values("total")
+        )
+        return self.annotate(claimed_bottles=Coalesce(Subquery(accepted), 0))
+
+    def nearby(self, point, distance):
+        """
+        Swaps within ``distance`` (a D measure) of ``point``, annotated with ``distance`` in
+        meters. Order by ``distance`` to walk the location index nearest first.
+        """
+        point = as_wgs84(point)
+        return self.filter(location__dwithin=(point, distance)).annotate(distance=KNNDistance("location", point))
+
+    def ranked_nearby(self, point, distance, candidates=RANK_CANDIDATES):
+        """
+        Up to ``candidates`` swaps nearest to ``point`` within ``distance``, annotated with
+        ``distance`` and a ``rank`` mixing proximity, freshness, available bottles and the
+        creator's reputation (see RANK_WEIGHTS). Order by ``-rank``.
+
+        The candidates come from a KNN walk of the location index, so the cost depends on
+        ``candidates`` rather than on how many swaps the radius holds. Freshness is linear in
+        ``created`` rather than measured from now, so a swap's rank doesn't drift between
+        requests and keyset pages stay consistent. It counts from RANK_FRESHNESS_EPOCH, only so
+        that ranks read as small numbers.
+        """
+        point = as_wgs84(point)
+        nearest = self.nearby(point, distance).order_by("distance")[:candidates].values("id")
+        weights = RANK_WEIGHTS
+        proximity = Value(1.0) - F("distance") / Value(float(distance.m))
+        freshness = (
+            Extract("created", "epoch", output_field=FloatField()) - Value(RANK_FRESHNESS_EPOCH.timestamp())
+        ) / Value(RANK_FRESHNESS_DAYS * 86400.0)
+        availability = Cast(
+            Least(F("total_bottles") - F("accepted_bottles"), Value(RANK_FULL_AVAILABILITY)), FloatField()
+        ) / Value(float(RANK_FULL_AVAILABILITY))
+        reputation = Coalesce(F("creator__brewer__score__score"), Value(RANK_UNRATED_SCORE))
+        return (
+            self.model.objects.filter(id__in=nearest)
+            .annotate(distance=KNNDistance("location", point))
+            .annotate(
+                rank=Value(weights["proximity"]) * proximity
+                + Value(weights["freshness"]) * freshness
+                + Value(weights["availability"]) * availability
+                + Value(weights["reputation"]) * reputation
+            )
+        )
+
+    def for_listing(self):
+        """
+        Load everything BrewSwapResponseSchema reads up front, so serializing a page
+        costs the same number of queries whatever its size.
+        """
+        return (
+            self.select_related("brew__brew_type", "brew__creator", "brew__score", "creator__brewer__score")
+            .prefetch_related("brew__qualities")
+            .with_claims_by_status()
+        )
+
+    def with_claims_by_status(self):
+        clone = self._chain()
+        clone._iterable_class = ClaimSummaryIterable
+        return clone
+
+
 class BrewSwap(CommonInfo):
     MAX_BOTTLES = 100  # This is mostly troll prevention
+    MAX_CLAIM_REVIEW = 200
 
     brew = models.OneToOneField(Brew, on_delete=models.CASCADE, related_name="swap")
     status = models.TextField(choices=BrewSwapStatusChoices.choices, default=BrewSwapStatusChoices.INACTIVE)
     total_bottles = models.IntegerField()
     max_increment = models.IntegerField(default=6)
+    accepted_bottles = models.IntegerField(default=0)  ## Kept in step by SwapClaim status changes
+    location = models.PointField(geography=True, null=True, blank=True)  ## Copy of the creator's Brewer.location, for nearby search
+
+    objects = BrewSwapQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created", "-id"], name="brewswap_created_idx"),  ## swaps
+            models.Index(fields=["creator", "-created", "-id"], name="brewswap_creator_created_idx"),  ## mySwaps
+            GistIndex(  ## nearbySwaps only searches live swaps
+                fields=["location"],
+                name="brewswap_live_location_idx",
+                condition=models.Q(status=BrewSwapStatusChoices.LIVE),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.location is None and self.creator_id is not None:
+            self.location = Brewer.objects.filter(user_id=self.creator_id).values_list("location", flat=True).first()
+        return super().save(*args, **kwargs)
 
     @property
     def bottles_available(self):
-        claimed = self.claims.filter(status=ClaimStatusChoices.ACCEPTED).aggregate(models.Sum("num_bottles"))["num_bottles__sum"]
-        if not claimed:
-            return self.total_bottles
-        return self.total_bottles - claimed
-    
+        return self.total_bottles - self.accepted_bottles
+
     @property
     def is_live(self):
         return self.status == BrewSwapStatusChoices.LIVE
@@ -39,7 +190,7 @@ class BrewSwap(CommonInfo):
         if self.status == BrewSwapStatusChoices.LIVE:
             return "Swap is already live"
         self.status = BrewSwapStatusChoices.LIVE
-        self.save()
+        self.save(update_fields=["status", "updated"])  # Leave accepted_bottles to the claims' updates
         return "Swap is now active"
     
     @property
@@ -50,7 +201,7 @@ class BrewSwap(CommonInfo):
         if self.status == BrewSwapStatusChoices.INACTIVE:
             return "Swap is already inactive"
         self.status = BrewSwapStatusChoices.INACTIVE
-        self.save()
+        self.save(update_fields=["status", "updated"])  # Leave accepted_bottles to the claims' updates
         return "Swap is now inactive"
     
     @property
@@ -61,33 +212,261 @@ class BrewSwap(CommonInfo):
         if self.status == BrewSwapStatusChoices.COMPLETE:
             return "Swap is already complete"
         self.status = BrewSwapStatusChoices.COMPLETE
-        self.save()
+        self.save(update_fields=["status", "updated"])  # Leave accepted_bottles to the claims' updates
         return "Swap is now complete"
+
+    def review_claims(self, decisions):
+        """
+        Accept or reject several of this swap's claims at once. ``decisions`` maps claim id
+        to ClaimStatusChoices.ACCEPTED or REJECTED.
+
+        The claims and then the swap row are locked once, and capacity is checked in memory
+        against the swap's counter; rejections are applied before acceptances so bottles they
+        free can be accepted in the same batch. Claims are written with one bulk_update and the counter with one
+        UPDATE. Returns ``{claim_id: (changed, message)}``; a claim that can't change is
+        reported and skipped without failing the rest.
+        """
+        from .signals import refresh_feed_on_commit  # Signals import this module
+
+        outcomes = {}
+        with transaction.atomic():
+            # Claims before the swap, like SwapClaim._set_status, so the two can't deadlock
+            claims = SwapClaim.objects.select_for_update().filter(swap_id=self.pk, id__in=list(decisions))
+            claims = {claim.id: claim for claim in claims.order_by("id")}
+            swap = BrewSwap.objects.select_for_update().get(pk=self.pk)
+            accepted_bottles = swap.accepted_bottles
+            now = timezone.now()
+            changed = []
+            ordered = sorted(decisions.items(), key=lambda item: item[1] == ClaimStatusChoices.ACCEPTED)
+            for claim_id, status in ordered:
+                claim = claims.get(claim_id)
+                verb = "accepted" if status == ClaimStatusChoices.ACCEPTED else "rejected"
+                if claim is None:
+                    outcomes[claim_id] = (False, f"Claim {claim_id} is not a claim on this swap")
+                    continue
+                if claim.status == status:
+                    outcomes[claim_id] = (False, f"Claim already {verb}")
+                    continue
+                if status == ClaimStatusChoices.ACCEPTED:
+                    if claim.creator_id == swap.creator_id:
+                        outcomes[claim_id] = (False, "You can't accept your own claim")
+                        continue
+                    if claim.status == ClaimStatusChoices.CANCELED:
+                        outcomes[claim_id] = (False, "This claim has already been canceled by the creator")
+                        continue
+                    if accepted_bottles + claim.num_bottles > swap.total_bottles:
+                        outcomes[claim_id] = (False, "Not enough bottles available")
+                        continue
+                    accepted_bottles += claim.num_bottles
+                elif claim.status == ClaimStatusChoices.ACCEPTED:
+                    accepted_bottles -= claim.num_bottles
+
+                claim.status = status
+                claim.updated = now
+                changed.append(claim)
+                outcomes[claim_id] = (True, f"Claim {verb}")
+
+            if changed:
+                SwapClaim.objects.bulk_update(changed, ["status", "updated"])
+                BrewSwap.objects.filter(pk=swap.pk).update(accepted_bottles=accepted_bottles, updated=now)
+                refresh_feed_on_commit([swap.pk])  # Neither update sends post_save
+                self.updated = now
+        self.accepted_bottles = accepted_bottles
+        return outcomes
     
 
+class SwapClaimQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Load everything SwapClaimResponseSchema reads, including the swap's listing fields."""
+        return self.select_related("brew__brew_type", "brew__creator", "creator").prefetch_related(
+            "brew__qualities",
+            Prefetch("swap", queryset=BrewSwap.objects.for_listing()),
+        )
+
+
 class SwapClaim(CommonInfo):
     brew = models.OneToOneField(Brew, on_delete=models.CASCADE)
     swap = models.ForeignKey(BrewSwap, on_delete=models.CASCADE, related_name="claims")
     num_bottles = models.IntegerField()
     status = models.TextField(choices=ClaimStatusChoices.choices, default=ClaimStatusChoices.PENDING)
 
+    objects = SwapClaimQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["swap", "status"], name="swapclaim_swap_status_idx"),
+            models.Index(  ## with_claimed_bottles / rebuild_swap_counters sum accepted bottles per swap
+                fields=["swap"],
+                include=["num_bottles"],
+                name="swapclaim_accepted_idx",
+                condition=models.Q(status=ClaimStatusChoices.ACCEPTED),
+            ),
+            models.Index(fields=["creator", "-created", "-id"], name="swapclaim_creator_created_idx"),  ## myClaims
+        ]
+
+    def _set_status(self, status):
+        """
+        Move the claim to ``status``, adjusting the swap's accepted bottle counter in the same
+        transaction. The claim row is locked so concurrent changes can't apply a delta twice,
+        and bottles are only reserved by an UPDATE that re-checks capacity on the locked swap
+        row, so concurrent acceptances can't over-allocate.
+        Returns False if the claim was already in ``status``.
+        """
+        with transaction.atomic():
+            current = SwapClaim.objects.select_for_update().values_list("status", flat=True).get(pk=self.pk)
+            if current == status:
+                self.status = status
+                return False
+            if status == ClaimStatusChoices.ACCEPTED and current == ClaimStatusChoices.CANCELED:
+                raise ValidationError("This claim has already been canceled by the creator")
+
+            delta = 0
+            if status == ClaimStatusChoices.ACCEPTED:
+                delta = self.num_bottles
+            elif current == ClaimStatusChoices.ACCEPTED:
+                delta = -self.num_bottles
+
+            if delta:
+                swaps = BrewSwap.objects.filter(pk=self.swap_id)
+                if delta > 0:
+                    swaps = swaps.filter(accepted_bottles__lte=F("total_bottles") - delta)
+                updated = swaps.update(
+                    accepted_bottles=F("accepted_bottles") + delta,
+                    updated=timezone.now(),
+                )
+                if not updated:
+                    available = BrewSwap.objects.get(pk=self.swap_id).bottles_available
+                    if available <= 0:
+                        raise ValidationError("Can't accept, no bottles remaining")
+                    raise ValidationError("Not enough bottles available")
+
+            self.status = status
+            self.save(update_fields=["status", "updated"])
+            if delta and SwapClaim.swap.is_cached(self):
+                self.swap.refresh_from_db(fields=["accepted_bottles", "updated"])
+        return True
+
     def accept(self):
-        if self.status == ClaimStatusChoices.ACCEPTED:
+        if not self._set_status(ClaimStatusChoices.ACCEPTED):
             return "Claim already accepted"
-        self.status = ClaimStatusChoices.ACCEPTED
-        self.save()
         return "Claim accepted"
     
     def reject(self):
-        if self.status == ClaimStatusChoices.REJECTED:
+        if not self._set_status(ClaimStatusChoices.REJECTED):
             return "Claim already rejected"
-        self.status = ClaimStatusChoices.REJECTED
-        self.save()
         return "Claim rejected"
     
     def cancel(self):
-        if self.status == ClaimStatusChoices.CANCELED:
+        if not self._set_status(ClaimStatusChoices.CANCELED):
             return "Claim already cancelled"
-        self.status = ClaimStatusChoices.CANCELED
-        self.save()
         return "Claim canceled"
+
+
+## Swap feed. A denormalized copy of what BrewSwapResponseSchema reads, one row per swap.
+
+def user_summary(user):
+    if user is None:
+        return None
+    return {"username": user.username, "email": user.email, "first_name": user.first_name}
+
+
+def lookup_summary(obj):
+    return {"id": obj.id, "value": obj.value}
+
+
+def brew_summary(brew):
+    return {
+        "id": brew.id,
+        "start_date": brew.start_date,
+        "completion_date": brew.completion_date,
+        "notes": brew.notes,
+        "brew_type": lookup_summary(brew.brew_type),
+        "qualities": [lookup_summary(quality) for quality in brew.qualities.all()],
+        "creator": user_summary(brew.creator),
+    }
+
+
+def score_summary(obj):
+    """``obj``'s score (a brewer or brew) shaped like ScoreSchema, or None if it was never rated."""
+    score = getattr(obj, "score", None)  # A missing reverse one-to-one raises an AttributeError
+    if score is None:
+        return None
+    return {"up": score.up, "down": score.down, "score": score.score}
+
+
+class SwapFeedQuerySet(models.QuerySet):
+    def refresh(self, swap_ids=None, batch_size=1000):
+        """
+        Rebuild the rows for ``swap_ids``, or every row when None, from the swaps themselves.
+        Returns the number of rows written.
+        """
+        swaps = BrewSwap.objects.for_listing().order_by("id")
+        if swap_ids is not None:
+            swaps = swaps.filter(id__in=swap_ids)
+
+        written = 0
+        last_id = 0
+        while True:
+            batch = list(swaps.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            self.bulk_create(
+                [SwapFeedRow.from_swap(swap) for swap in batch],
+                update_conflicts=True,
+                unique_fields=["swap"],
+                update_fields=SwapFeedRow.REFRESHED_FIELDS,
+            )
+            written += len(batch)
+            last_id = batch[-1].id
+        return written
+
+
+class SwapFeedRow(models.Model):
+    """
+    Kept in step by the signals in brewswaps.signals once each transaction commits. Run
+    ``manage.py refresh_swap_feed`` periodically (and once after migrating) to repair drift.
+    """
+    REFRESHED_FIELDS = [
+        "status", "total_bottles", "max_increment", "bottles_available",
+        "claims_count", "claims_by_status", "created", "brew", "creator",
+        "creator_score", "brew_score",
+    ]
+
+    swap = models.OneToOneField(BrewSwap, on_delete=models.CASCADE, primary_key=True, related_name="feed_row")
+    status = models.TextField(choices=BrewSwapStatusChoices.choices)
+    total_bottles = models.IntegerField()
+    max_increment = models.IntegerField()
+    bottles_available = models.IntegerField()
+    claims_count = models.IntegerField()
+    claims_by_status = models.JSONField(default=dict)
+    created = models.DateTimeField()  ## The swap's created, for ordering
+    brew = models.JSONField(encoder=DjangoJSONEncoder)  ## Shaped like BrewResponseSchema
+    creator = models.JSONField(encoder=DjangoJSONEncoder, null=True)  ## Shaped like UserLimitedSchema
+    creator_score = models.JSONField(null=True)  ## Shaped like ScoreSchema
+    brew_score = models.JSONField(null=True)
+
+    objects = SwapFeedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created", "-swap"], name="swapfeed_created_idx"),
+            models.Index(fields=["status", "-created", "-swap"], name="swapfeed_status_created_idx"),
+        ]
+
+    @classmethod
+    def from_swap(cls, swap):
+        """``swap`` should come from BrewSwap.objects.for_listing()."""
+        return cls(
+            swap_id=swap.id,
+            status=swap.status,
+            total_bottles=swap.total_bottles,
+            max_increment=swap.max_increment,
+            bottles_available=swap.bottles_available,
+            claims_count=sum(swap.claims_by_status.values()),
+            claims_by_status=swap.claims_by_status,
+            created=swap.created,
+            brew=brew_summary(swap.brew),
+            creator=user_summary(swap.creator),
+            creator_score=score_summary(getattr(swap.creator, "brewer", None)),
+            brew_score=score_summary(swap.brew),
+        )
@@ -0,0 +1,124 @@
+from threading import local
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+
+from brewers.models import Brewer
+from brews.models import Brew, BrewType, Quality
+from ratings.models import BrewerScore, BrewScore
+from .models import BrewSwap, ClaimStatusChoices, SwapClaim, SwapFeedRow
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Brewer)
+def sync_swap_locations(sender, instance, update_fields=None, **kwargs):
+    """Keep the location copied onto the brewer's swaps in step with their profile."""
+    if update_fields is not None and "location" not in update_fields:
+        return
+    BrewSwap.objects.filter(creator_id=instance.user_id).update(location=instance.location)
+
+
+## Swap feed. Changed swap ids are collected and refreshed together once the transaction commits.
+
+_pending = local()
+
+
+def _flush_feed_refresh():
+    swap_ids = getattr(_pending, "swap_ids", None)
+    if not swap_ids:
+        return
+    _pending.swap_ids = set()
+    SwapFeedRow.objects.refresh(swap_ids)
+
+
+def refresh_feed_on_commit(swap_ids):
+    swap_ids = set(swap_ids)
+    if not swap_ids:
+        return
+    if getattr(_pending, "swap_ids", None) is None:
+        _pending.swap_ids = set()
+    _pending.swap_ids |= swap_ids
+    transaction.on_commit(_flush_feed_refresh)
+
+
+@receiver(post_save, sender=BrewSwap)
+def swap_saved(sender, instance, **kwargs):
+    refresh_feed_on_commit([instance.id])
+
+
+@receiver(post_save, sender=SwapClaim)
+@receiver(post_delete, sender=SwapClaim)
+def claim_changed(sender, instance, **kwargs):
+    refresh_feed_on_commit([instance.swap_id])
+
+
+@receiver(post_delete, sender=SwapClaim)
+def release_deleted_claim_bottles(sender, instance, **kwargs):
+    """
+    Give an accepted claim's bottles back to its swap when the claim is deleted, including
+    by cascade from the claimer's brew. A no-op if the swap is being deleted too.
+    """
+    if instance.status != ClaimStatusChoices.ACCEPTED:
+        return
+    BrewSwap.objects.filter(pk=instance.swap_id).update(
+        accepted_bottles=F("accepted_bottles") - instance.num_bottles,
+        updated=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Brew)
+def brew_saved(sender, instance, created, **kwargs):
+    if created:
+        return  # Not on a swap yet
+    refresh_feed_on_commit(BrewSwap.objects.filter(brew=instance).values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Brew.qualities.through)
+def brew_qualities_changed(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, Brew):
+        swaps = BrewSwap.objects.filter(brew=instance)
+    elif pk_set:
+        swaps = BrewSwap.objects.filter(brew_id__in=pk_set)
+    else:
+        return  # A cleared quality; refresh_swap_feed picks this up
+    refresh_feed_on_commit(swaps.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=BrewType)
+@receiver(post_save, sender=Quality)
+def lookup_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    lookup = "brew__brew_type" if sender is BrewType else "brew__qualities"
+    refresh_feed_on_commit(BrewSwap.objects.filter(**{lookup: instance}).values_list("id", flat=True))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not set(update_fields) & {"username", "email", "first_name"}:
+        return  # e.g. last_login on every login
+    swaps = BrewSwap.objects.filter(creator=instance) | BrewSwap.objects.filter(brew__creator=instance)
+    refresh_feed_on_commit(swaps.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=BrewerScore)
+@receiver(post_delete, sender=BrewerScore)
+def brewer_score_changed(sender, instance, **kwargs):
+    swaps = BrewSwap.objects.filter(creator__brewer__pk=instance.brewer_id)
+    refresh_feed_on_commit(swaps.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=BrewScore)
+@receiver(post_delete, sender=BrewScore)
+def brew_score_changed(sender, instance, **kwargs):
+    refresh_feed_on_commit(BrewSwap.objects.filter(brew_id=instance.brew_id).values_list("id", flat=True))
@@ -1,3 +1,118 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from common.tests import ModelTestBase
+from .models import BrewSwap, BrewSwapStatusChoices, ClaimStatusChoices, SwapClaim
+
+
+class BrewSwapCounterTestCase(ModelTestBase):
+    def setUp(self):
+        super().setUp()
+        self.swap = BrewSwap.objects.create(
+            creator=self.user,
+            brew=self.create_brew(),
+            total_bottles=12,
+        )
+
+    def create_claim(self, num_bottles=4):
+        return SwapClaim.objects.create(
+            creator=self.user,
+            brew=self.create_brew(),
+            swap=self.swap,
+            num_bottles=num_bottles,
+        )
+
+    def test_accept_reject_cancel(self):
+        claim1 = self.create_claim(4)
+        claim2 = self.create_claim(5)
+        self.assertEqual(self.swap.bottles_available, 12)
+
+        self.assertEqual(claim1.accept(), "Claim accepted")
+        self.assertEqual(claim1.accept(), "Claim already accepted")
+        claim2.accept()
+        self.swap.refresh_from_db()
+        self.assertEqual(self.swap.accepted_bottles, 9)
+        self.assertEqual(self.swap.bottles_available, 3)
+
+        claim1.reject()
+        claim2.cancel()
+        self.swap.refresh_from_db()
+        self.assertEqual(self.swap.accepted_bottles, 0)
+        self.assertEqual(claim2.status, ClaimStatusChoices.CANCELED)
+
+    def test_review_claims(self):
+        claims = [self.create_claim(n) for n in (4, 5, 6)]
+        claims[0].accept()
+        claims[2].cancel()
+        ACCEPTED, REJECTED = ClaimStatusChoices.ACCEPTED, ClaimStatusChoices.REJECTED
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outcomes = self.swap.review_claims({
+                claims[1].id: ACCEPTED,
+                claims[2].id: ACCEPTED,
+                0: REJECTED,
+            })
+        self.assertEqual(outcomes[claims[1].id], (True, "Claim accepted"))
+        self.assertFalse(outcomes[claims[2].id][0])
+        self.assertFalse(outcomes[0][0])
+        self.assertEqual(self.swap.accepted_bottles, 9)
+
+        # 9 of 12 bottles are taken: the rejection frees room for the 6 bottle claim
+        SwapClaim.objects.filter(id=claims[2].id).update(status=ClaimStatusChoices.PENDING)
+        outcomes = self.swap.review_claims({claims[2].id: ACCEPTED, claims[0].id: REJECTED})
+        self.assertTrue(outcomes[claims[2].id][0])
+        self.swap.refresh_from_db()
+        self.assertEqual(self.swap.accepted_bottles, 11)
+        self.assertEqual(SwapClaim.objects.get(id=claims[0].id).status, REJECTED)
+        call_command("rebuild_swap_counters", "--check", stdout=StringIO())
+
+    def test_delete_accepted_claim(self):
+        claim = self.create_claim(4)
+        claim.accept()
+        self.create_claim(3).accept()
+
+        claim.brew.delete()  # Cascades to the claim
+        self.swap.refresh_from_db()
+        self.assertEqual(self.swap.accepted_bottles, 3)
+        call_command("rebuild_swap_counters", "--check", stdout=StringIO())
+
+    def test_set_live_keeps_accepted_bottles(self):
+        stale = BrewSwap.objects.get(pk=self.swap.pk)
+        self.create_claim(4).accept()
+        stale.set_live()
+        self.swap.refresh_from_db()
+        self.assertEqual(self.swap.status, BrewSwapStatusChoices.LIVE)
+        self.assertEqual(self.swap.accepted_bottles, 4)
+        call_command("rebuild_swap_counters", "--check")
+
+    def test_bottles_available_no_queries(self):
+        self.create_claim(4).accept()
+        swap = BrewSwap.objects.get(id=self.swap.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(swap.bottles_available, 8)
+
+    def test_rebuild_counters(self):
+        self.create_claim(4).accept()
+        BrewSwap.objects.filter(id=self.swap.id).update(accepted_bottles=0)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_swap_counters", "--check")
+
+        call_command("rebuild_swap_counters")
+        self.swap.refresh_from_db()
+        self.assertEqual(self.swap.accepted_bottles, 4)
+        call_command("rebuild_swap_counters", "--check")
+
+    def test_claims_by_status_chunks(self):
+        self.create_claim(1)
+        for _ in range(2):
+            BrewSwap.objects.create(creator=self.user, brew=self.create_brew(), total_bottles=6)
+
+        # The swap query streams; each chunk of 2 gets its own summary query
+        with self.assertNumQueries(3):
+            swaps = list(BrewSwap.objects.order_by("id").with_claims_by_status().iterator(chunk_size=2))
+        self.assertEqual(len(swaps), 3)
+        self.assertEqual(swaps[0].claims_by_status[ClaimStatusChoices.PENDING], 1)
+        self.assertEqual(sum(swaps[2].claims_by_status.values()), 0)
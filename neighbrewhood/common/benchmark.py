@@ -0,0 +1,185 @@
+"""
+Synthetic data and timing helpers shared by the benchmark management commands.
+
+Seeding goes through bulk_create, so it skips model save() and signals: anything
+normally denormalized on save (e.g. BrewSwap.location) is filled in here directly.
+"""
+import math
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+
+from brewers.models import Brewer
+from brews.models import Brew, BrewType, Quality
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, ClaimStatusChoices, SwapClaim
+from giveaways.models import Giveaway
+from ratings.models import BrewerScore, wilson_lower_bound
+
+
+User = get_user_model()
+
+DEFAULT_CENTER = Point(-121.4944, 38.5816, srid=4326)  # Sacramento
+MILES_PER_DEGREE = 69.0
+BATCH_SIZE = 2000
+
+
+def random_point(rng, center=DEFAULT_CENTER, radius_mi=60):
+    """A point spread uniformly over a disc of ``radius_mi`` miles around ``center``."""
+    distance = radius_mi * math.sqrt(rng.random())
+    bearing = rng.uniform(0, 2 * math.pi)
+    dlat = distance * math.cos(bearing) / MILES_PER_DEGREE
+    dlon = distance * math.sin(bearing) / (MILES_PER_DEGREE * math.cos(math.radians(center.y)))
+    return Point(center.x + dlon, center.y + dlat, srid=4326)
+
+
+def seed_brewers(rng, num_brewers, prefix="bench", center=DEFAULT_CENTER, radius_mi=60):
+    users = User.objects.bulk_create(
+        [User(username=f"{prefix}_{i}", password="!") for i in range(num_brewers)],
+        batch_size=BATCH_SIZE,
+    )
+    return Brewer.objects.bulk_create(
+        [
+            Brewer(
+                user=user,
+                creator=user,
+                location=random_point(rng, center, radius_mi),
+                phone_number="+15405551212",
+            )
+            for user in users
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def seed_scores(rng, brewers, rated_fraction=0.5, max_ratings=40):
+    """BrewerScore rows for about ``rated_fraction`` of ``brewers``, with random vote counts."""
+    scores = []
+    for brewer in brewers:
+        if rng.random() >= rated_fraction:
+            continue
+        up = rng.randint(0, max_ratings)
+        down = rng.randint(0, max_ratings - up)
+        scores.append(BrewerScore(brewer=brewer, up=up, down=down, score=wilson_lower_bound(up, down)))
+    return BrewerScore.objects.bulk_create(scores, batch_size=BATCH_SIZE)
+
+
+def seed_qualities(num_qualities):
+    return [Quality.objects.get_or_create(value=f"Benchmark {i}")[0] for i in range(num_qualities)]
+
+
+def seed_brews(rng, owners, qualities=(), qualities_per_brew=2):
+    """One brew per owner Brewer, tagged with up to ``qualities_per_brew`` random ``qualities``."""
+    brew_type, _ = BrewType.objects.get_or_create(value="Benchmark Ale")
+    brews = Brew.objects.bulk_create(
+        [Brew(creator=owner.user, brew_type=brew_type, notes="benchmark brew") for owner in owners],
+        batch_size=BATCH_SIZE,
+    )
+    if qualities:
+        Through = Brew.qualities.through
+        Through.objects.bulk_create(
+            [
+                Through(brew_id=brew.id, quality_id=quality.id)
+                for brew in brews
+                for quality in rng.sample(list(qualities), min(qualities_per_brew, len(qualities)))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    Brew.objects.filter(id__in=[brew.id for brew in brews]).refresh_search_vector()
+    return brews
+
+
+def seed_swaps(rng, brewers, num_swaps, live_fraction=1.0, qualities=()):
+    owners = [rng.choice(brewers) for _ in range(num_swaps)]
+    brews = seed_brews(rng, owners, qualities)
+    return BrewSwap.objects.bulk_create(
+        [
+            BrewSwap(
+                brew=brew,
+                creator=owner.user,
+                location=owner.location,
+                total_bottles=rng.randint(6, 48),
+                status=BrewSwapStatusChoices.LIVE if rng.random() < live_fraction else BrewSwapStatusChoices.INACTIVE,
+            )
+            for brew, owner in zip(brews, owners)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def seed_claims(rng, brewers, swaps, num_claims, accept_fraction=0.2, qualities=()):
+    """
+    Claims by random brewers on other brewers' swaps. About ``accept_fraction`` are accepted,
+    as far as the swap has bottles left, and the swaps' accepted_bottles counters are updated
+    to match.
+    """
+    if len(brewers) < 2 or not swaps:
+        return []
+    picks = []
+    for _ in range(num_claims):
+        swap = rng.choice(swaps)
+        claimer = rng.choice(brewers)
+        while claimer.user_id == swap.creator_id:
+            claimer = rng.choice(brewers)
+        picks.append((swap, claimer))
+
+    brews = seed_brews(rng, [claimer for _, claimer in picks], qualities)
+    claims = []
+    for (swap, claimer), brew in zip(picks, brews):
+        num_bottles = rng.randint(1, swap.max_increment)
+        status = ClaimStatusChoices.PENDING
+        if rng.random() < accept_fraction and num_bottles <= swap.bottles_available:
+            status = ClaimStatusChoices.ACCEPTED
+            swap.accepted_bottles += num_bottles
+        claims.append(SwapClaim(creator=claimer.user, brew=brew, swap=swap, num_bottles=num_bottles, status=status))
+
+    BrewSwap.objects.bulk_update(swaps, ["accepted_bottles"], batch_size=BATCH_SIZE)
+    return SwapClaim.objects.bulk_create(claims, batch_size=BATCH_SIZE)
+
+
+def seed_giveaways(rng, brewers, num_giveaways, qualities=()):
+    owners = [rng.choice(brewers) for _ in range(num_giveaways)]
+    brews = seed_brews(rng, owners, qualities)
+    return Giveaway.objects.bulk_create(
+        [
+            Giveaway(
+                brewer=owner,
+                brew=brew,
+                creator=owner.user,
+                location=owner.location,
+                bottles_available=100,
+                max_increment=6,
+                status=Giveaway.StatusChoices.OPEN,
+            )
+            for brew, owner in zip(brews, owners)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def time_calls(fn, iterations):
+    """Run ``fn`` ``iterations`` times, returning each call's wall time in seconds."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    return {
+        "n": len(samples),
+        "mean_ms": 1000 * sum(samples) / len(samples),
+        "p50_ms": 1000 * percentile(samples, 50),
+        "p95_ms": 1000 * percentile(samples, 95),
+        "p99_ms": 1000 * percentile(samples, 99),
+    }
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from common.metrics import metrics
+
+
+def acquire_connection(alias=DEFAULT_DB_ALIAS):
+    """Check a connection out (pooled) or open it (persistent), run a trivial query, and time it."""
+    connection = connections[alias]
+    start = time.perf_counter()
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    seconds = time.perf_counter() - start
+    metrics.observe_value("db_connection_acquire_seconds", seconds)
+    return seconds
+
+
+def warm_up_database(alias=DEFAULT_DB_ALIAS, samples=None):
+    """
+    Open database connections before the first request needs one. With DB_POOL the pool is
+    filled to its min_size and ``samples`` checkouts are timed; with persistent connections
+    this thread's connection is opened and left open for the first request to reuse.
+    Acquisition latency and the total warm-up time are reported on /api/metrics.
+    wsgi.py and asgi.py only call it with DB_POOL, see settings.DB_WARMUP.
+    """
+    connection = connections[alias]
+    samples = settings.DB_WARMUP_SAMPLES if samples is None else samples
+    start = time.perf_counter()
+
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        pool.wait(timeout=connection.settings_dict["OPTIONS"]["pool"].get("timeout", 30))
+        for _ in range(samples):
+            acquire_connection(alias)
+            connection.close()  # Returns it to the pool
+    else:
+        acquire_connection(alias)
+
+    total = time.perf_counter() - start
+    metrics.set_gauge("db_warmup_seconds", total)
+    return total
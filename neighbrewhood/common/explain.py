@@ -0,0 +1,152 @@
+"""
+EXPLAIN ANALYZE checks for the queries the services run on hot paths. Each entry builds
+its queryset from representative rows of the seeded benchmark dataset and names the
+indexes it is meant to use. A query is reported when its plan sequentially scans one of
+its ``tables`` or uses none of its ``indexes``, since either means the index it was added
+for is missing or unusable. Any index scan, such as one on the primary key, can replace a
+Seq Scan, so checking only for Seq Scans would not catch a missing index.
+
+On a small dataset the planner rightly prefers sequential scans, so ``force_index`` turns
+them off (``SET LOCAL enable_seqscan = off``): a Seq Scan that survives that has no usable
+index at all.
+"""
+import json
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+from django.contrib.gis.measure import D
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from brewers.models import Brewer
+from brews.models import Brew
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, ClaimStatusChoices, SwapClaim
+from common.gis import as_geography
+from giveaways.models import Giveaway
+
+
+PAGE = 20
+
+
+@dataclass
+class ExplainedQuery:
+    name: str
+    tables: Sequence[str]
+    indexes: Sequence[str]  # The plan must use at least one of these
+    build: Callable  # (sample) -> queryset
+
+
+QUERIES = [
+    ExplainedQuery(
+        "swaps", ["brewswaps_brewswap"], ["brewswap_created_idx"],
+        lambda s: BrewSwap.objects.order_by("-created", "-id")[:PAGE],
+    ),
+    ExplainedQuery(
+        "my_swaps", ["brewswaps_brewswap"], ["brewswap_creator_created_idx"],
+        lambda s: BrewSwap.objects.filter(creator_id=s.user_id).order_by("-created", "-id")[:PAGE],
+    ),
+    ExplainedQuery(
+        "nearby_swaps", ["brewswaps_brewswap"], ["brewswap_live_location_idx"],
+        lambda s: BrewSwap.objects.filter(status=BrewSwapStatusChoices.LIVE)
+        .nearby(s.location, D(mi=20)).order_by("distance", "id")[:PAGE],
+    ),
+    ExplainedQuery(
+        "ranked_nearby_swaps", ["brewswaps_brewswap"], ["brewswap_live_location_idx"],
+        lambda s: BrewSwap.objects.filter(status=BrewSwapStatusChoices.LIVE)
+        .ranked_nearby(s.location, D(mi=20)).order_by("-rank", "id")[:PAGE],
+    ),
+    ExplainedQuery(
+        "accepted_bottles", ["brewswaps_swapclaim"], ["swapclaim_accepted_idx", "swapclaim_swap_status_idx"],
+        lambda s: SwapClaim.objects.filter(swap_id=s.swap_id, status=ClaimStatusChoices.ACCEPTED)
+        .values("swap").annotate(total=Sum("num_bottles")),
+    ),
+    ExplainedQuery(
+        "my_claims", ["brewswaps_swapclaim"], ["swapclaim_creator_created_idx"],
+        lambda s: SwapClaim.objects.filter(creator_id=s.claimer_id).order_by("-created", "-id")[:PAGE],
+    ),
+    ExplainedQuery(
+        "my_brews", ["brews_brew"], ["brew_creator_created_idx"],
+        lambda s: Brew.objects.filter(creator_id=s.user_id).order_by("-created", "-id")[:PAGE],
+    ),
+    ExplainedQuery(
+        "nearby_giveaways", ["giveaways_giveaway"], ["giveaway_open_geog_idx"],
+        lambda s: Giveaway.objects.open().nearby(s.location, D(mi=20)).order_by("distance", "id")[:PAGE],
+    ),
+    ExplainedQuery(
+        "nearby_brewers", ["brewers_brewer"], ["brewer_geog_idx"],
+        lambda s: Brewer.objects.annotate(geog=as_geography("location"))
+        .filter(geog__dwithin=(s.location, D(mi=5)))[:PAGE],
+    ),
+]
+
+
+@dataclass
+class Sample:
+    """Representative ids and a location taken from existing rows."""
+    user_id: int
+    swap_id: int
+    claimer_id: int
+    location: object
+
+    @classmethod
+    def from_database(cls, prefix=""):
+        claim = (
+            SwapClaim.objects.filter(
+                status=ClaimStatusChoices.ACCEPTED,
+                swap__location__isnull=False,
+                swap__creator__username__startswith=prefix,
+            )
+            .select_related("swap")
+            .order_by("id")
+            .first()
+        )
+        if claim is None:
+            return None
+        return cls(
+            user_id=claim.swap.creator_id,
+            swap_id=claim.swap_id,
+            claimer_id=claim.creator_id,
+            location=claim.swap.location,
+        )
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(queryset):
+    """The root node of the queryset's EXPLAIN ANALYZE plan."""
+    return json.loads(queryset.explain(analyze=True, format="json"))[0]["Plan"]
+
+
+def seq_scans(plan, tables):
+    """Tables from ``tables`` that ``plan`` scans sequentially."""
+    return sorted({
+        node["Relation Name"]
+        for node in plan_nodes(plan)
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in tables
+    })
+
+
+def indexes_used(plan):
+    """Names of the indexes scanned anywhere in ``plan``, including bitmap and index-only scans."""
+    return {node["Index Name"] for node in plan_nodes(plan) if "Index Name" in node}
+
+
+def check_queries(sample, queries=QUERIES, force_index=False):
+    """``{query name: [problems]}`` for the queries that scan sequentially or miss their indexes."""
+    failures = {}
+    for query in queries:
+        with transaction.atomic():
+            if force_index:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = explain(query.build(sample))
+        problems = [f"Seq Scan on {table}" for table in seq_scans(plan, query.tables)]
+        if not indexes_used(plan) & set(query.indexes):
+            problems.append(f"doesn't use {' or '.join(query.indexes)}")
+        if problems:
+            failures[query.name] = problems
+    return failures
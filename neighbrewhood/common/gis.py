@@ -0,0 +1,39 @@
+from django.contrib.gis.db.models import PointField
+from django.db.models import FloatField, Func, Value
+from django.db.models.functions import Cast
+
+
+WGS84 = 4326
+
+
+def as_wgs84(point):
+    """Return ``point`` in WGS84, assuming WGS84 when it carries no SRID."""
+    if point.srid is None:
+        point = point.clone()
+        point.srid = WGS84
+    elif point.srid != WGS84:
+        point = point.transform(WGS84, clone=True)
+    return point
+
+
+def as_geography(field):
+    """
+    A geometry column cast to geography, for meter-based lookups (dwithin with D()) on
+    WGS84 geometry fields. Index the same expression so those lookups can use it.
+    """
+    return Cast(field, output_field=PointField(srid=WGS84, geography=True))
+
+
+class KNNDistance(Func):
+    """
+    Distance in meters between a geography column and ``point``, using PostGIS' ``<->``
+    operator. Unlike Distance(), ordering by it lets the column's GiST index hand back
+    the nearest rows first instead of sorting every match.
+    """
+    template = "(%(expressions)s)"
+    arg_joiner = " <-> "
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        point = Value(as_wgs84(point), output_field=PointField(srid=WGS84, geography=True))
+        super().__init__(expression, point, **extra)
@@ -0,0 +1,93 @@
+from threading import Lock
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+
+class LookupTable:
+    """
+    In-process copy of a small reference table (brew types, qualities), reloaded only when
+    the table's version changes.
+
+    post_save/post_delete bump the version immediately and again on commit, so a reader
+    racing the writing transaction can't keep pre-commit rows under the new version. With
+    ``settings.LOOKUP_CACHE_ALIAS`` naming a Django cache, the version lives there and a
+    bump in one process reloads every process; otherwise it is per process.
+    """
+    tables = []
+
+    def __init__(self, model):
+        self.model = model
+        self._lock = Lock()
+        self._local_version = uuid4().hex
+        self._loaded_version = None
+        self._rows = {}
+        post_save.connect(self._changed, sender=model, weak=False)
+        post_delete.connect(self._changed, sender=model, weak=False)
+        LookupTable.tables.append(self)
+
+    @property
+    def _shared(self):
+        alias = getattr(settings, "LOOKUP_CACHE_ALIAS", None)
+        return caches[alias] if alias else None
+
+    @property
+    def _version_key(self):
+        return f"lookup-version:{self.model._meta.label_lower}"
+
+    @property
+    def version(self):
+        shared = self._shared
+        if shared is None:
+            return self._local_version
+        version = shared.get(self._version_key)
+        if version is None:
+            shared.add(self._version_key, uuid4().hex, timeout=None)
+            version = shared.get(self._version_key)
+        return version
+
+    @property
+    def etag(self):
+        return f"{self.model._meta.label_lower}-{self.version}"
+
+    def bump(self):
+        with self._lock:
+            self._local_version = uuid4().hex
+        shared = self._shared
+        if shared is not None:
+            shared.set(self._version_key, uuid4().hex, timeout=None)
+
+    def _changed(self, **kwargs):
+        self.bump()
+        transaction.on_commit(self.bump)
+
+    @classmethod
+    def bump_all(cls):
+        for table in cls.tables:
+            table.bump()
+
+    def _current_rows(self):
+        version = self.version
+        if self._loaded_version != version:
+            rows = {obj.pk: obj for obj in self.model.objects.order_by("pk")}
+            with self._lock:
+                self._rows = rows
+                self._loaded_version = version
+        return self._rows
+
+    def all(self):
+        return list(self._current_rows().values())
+
+    def get(self, pk):
+        """The cached row with primary key ``pk``, or None."""
+        return self._current_rows().get(pk)
+
+    def in_bulk(self, pks):
+        """Cached rows for ``pks`` in the order given, plus the pks that don't exist."""
+        rows = self._current_rows()
+        found = [rows[pk] for pk in pks if pk in rows]
+        missing = [pk for pk in pks if pk not in rows]
+        return found, missing
@@ -0,0 +1,186 @@
+import json
+import random
+import subprocess
+import time
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, SwapClaim
+from common.benchmark import percentile
+from common.metrics import QueryCounter
+from common.schemas import schema_documents
+from giveaways.models import Giveaway
+from services.common.auth import BrewerTokenObtainPairInputSchema
+from services.swapservice.schemas import SwapClaimCreateSchema
+
+
+def api_url(name, *args, query=None):
+    url = reverse(f"api-1.0.0:{name}", args=args)
+    return f"{url}?{urlencode(query, doseq=True)}" if query else url
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the API routers in-process with the test client against data from "
+        "`manage.py seed_benchmark`, and print throughput, latency percentiles and queries per "
+        "request as JSON. Everything the requests write is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="bench", help="Username prefix given to seed_benchmark")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--only", nargs="+", help="Run only these scenarios")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def client_for(self, user):
+        tokens = BrewerTokenObtainPairInputSchema.get_token(user)
+        return Client(HTTP_HOST="localhost", headers={"Authorization": f"Bearer {tokens['access']}"})
+
+    def scenarios(self, rng, prefix):
+        """(name, client, method, url, body) per endpoint. URLs are callables so each call can vary its ids."""
+        claim = (
+            SwapClaim.objects.filter(
+                swap__status=BrewSwapStatusChoices.LIVE,
+                swap__creator__username__startswith=prefix,
+            )
+            .select_related("swap__creator", "creator")
+            .order_by("id")
+            .first()
+        )
+        if claim is None:
+            raise CommandError(f"No seeded claims for prefix {prefix!r}, run seed_benchmark first")
+        owner, claimer = claim.swap.creator, claim.creator
+        owner_client, claimer_client = self.client_for(owner), self.client_for(claimer)
+
+        swap_ids = list(
+            BrewSwap.objects.filter(status=BrewSwapStatusChoices.LIVE, creator__username__startswith=prefix)
+            .values_list("id", flat=True)[:1000]
+        )
+        brew_type_id = claim.brew.brew_type_id
+        quality_ids = list(claim.brew.qualities.values_list("id", flat=True))
+        giveaway_ids = list(
+            Giveaway.objects.filter(status=Giveaway.StatusChoices.OPEN)
+            .exclude(brewer__user=claimer)
+            .values_list("id", flat=True)[:1000]
+        )
+
+        review_claim_ids = list(claim.swap.claims.order_by("id").values_list("id", flat=True)[:20])
+        owner_brewer_id = owner.brewer.id
+        location = claimer.brewer.location
+        bbox = ",".join(str(v) for v in (location.x - 0.5, location.y - 0.5, location.x + 0.5, location.y + 0.5))
+        search = {"q": "benchmark ale"}
+
+        def new_brew():
+            return {"brew_type": brew_type_id, "qualities": quality_ids, "notes": "bench brew"}
+
+        def review():
+            # Random decisions, so each call moves some claims instead of repeating the last review
+            return {"claims": [{"claim": i, "decision": rng.choice(("accept", "reject"))} for i in review_claim_ids]}
+
+        def rating():
+            return {"rating": rng.random() < 0.8, "review": "bench rating"}
+
+        scenarios = [
+            ("users_me", owner_client, "get", lambda: api_url("users_me"), None),
+            ("users_profile", owner_client, "get", lambda: api_url("users_profile"), None),
+            ("brew_brew_types", owner_client, "get", lambda: api_url("brew_brew_types"), None),
+            ("brew_qualities", owner_client, "get", lambda: api_url("brew_qualities"), None),
+            ("brew_brews", owner_client, "get", lambda: api_url("brew_brews"), None),
+            ("brew_my_brews", owner_client, "get", lambda: api_url("brew_my_brews"), None),
+            ("brew_create_brew", owner_client, "post", lambda: api_url("brew_create_brew"), new_brew),
+            ("brewswaps_swaps", owner_client, "get", lambda: api_url("brewswaps_swaps"), None),
+            ("brewswaps_my_swaps", owner_client, "get", lambda: api_url("brewswaps_my_swaps"), None),
+            ("brewswaps_nearby_swaps", claimer_client, "get", lambda: api_url("brewswaps_nearby_swaps"), None),
+            ("brewswaps_detail", claimer_client, "get", lambda: api_url("brewswaps_detail", rng.choice(swap_ids)), None),
+            ("brewswaps_claims", owner_client, "get", lambda: api_url("brewswaps_claims", claim.swap_id), None),
+            ("claims_my_claims", claimer_client, "get", lambda: api_url("claims_my_claims"), None),
+            ("claims_claim_detail", claimer_client, "get", lambda: api_url("claims_claim_detail", claim.id), None),
+            ("brew_search", claimer_client, "get", lambda: api_url("brew_search", query=search), None),
+            ("brew_search_facets", claimer_client, "get", lambda: api_url("brew_search_facets", query=search), None),
+            ("brewswaps_feed", claimer_client, "get", lambda: api_url("brewswaps_feed"), None),
+            (
+                "brewswaps_review_claims", owner_client, "post",
+                lambda: api_url("brewswaps_review_claims", claim.swap_id), review,
+            ),
+            ("schemas_document", claimer_client, "get", lambda: schema_documents.ref(SwapClaimCreateSchema), None),
+            ("async_swaps", owner_client, "get", lambda: api_url("async_swaps"), None),
+            ("async_my_swaps", owner_client, "get", lambda: api_url("async_my_swaps"), None),
+            ("async_nearby_swaps", claimer_client, "get", lambda: api_url("async_nearby_swaps"), None),
+            ("async_my_claims", claimer_client, "get", lambda: api_url("async_my_claims"), None),
+            ("async_brews", owner_client, "get", lambda: api_url("async_brews"), None),
+            ("ratings_rate_brewer", claimer_client, "post", lambda: api_url("ratings_rate_brewer", owner_brewer_id), rating),
+            ("ratings_rate_brew", claimer_client, "post", lambda: api_url("ratings_rate_brew", claim.swap.brew_id), rating),
+            ("ratings_brewer_score", claimer_client, "get", lambda: api_url("ratings_brewer_score", owner_brewer_id), None),
+            ("ratings_brew_score", claimer_client, "get", lambda: api_url("ratings_brew_score", claim.swap.brew_id), None),
+            ("giveaways_nearby", claimer_client, "get", lambda: api_url("giveaways_nearby"), None),
+            (
+                "giveaways_clusters", claimer_client, "get",
+                lambda: api_url("giveaways_clusters", query={"bbox": bbox, "zoom": 10}), None,
+            ),
+        ]
+        if giveaway_ids:
+            scenarios.append((
+                "giveaways_claim", claimer_client, "post",
+                lambda: api_url("giveaways_claim", rng.choice(giveaway_ids)), lambda: {"num_bottles": 1},
+            ))
+        return scenarios
+
+    def run_scenario(self, client, method, url, body, iterations, warmup):
+        def call():
+            kwargs = {"data": json.dumps(body()), "content_type": "application/json"} if body else {}
+            return getattr(client, method)(url(), **kwargs)
+
+        for _ in range(warmup):
+            call()
+
+        latencies, queries, statuses = [], [], {}
+        started = time.perf_counter()
+        for _ in range(iterations):
+            counter = QueryCounter()
+            start = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = call()
+            latencies.append(time.perf_counter() - start)
+            queries.append(counter.count)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+
+        return {
+            "requests": iterations,
+            "throughput_rps": iterations / elapsed,
+            "p50_ms": 1000 * percentile(latencies, 50),
+            "p95_ms": 1000 * percentile(latencies, 95),
+            "p99_ms": 1000 * percentile(latencies, 99),
+            "queries_per_request": sum(queries) / iterations,
+            "max_queries": max(queries),
+            "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        results = {}
+        with transaction.atomic():
+            for name, client, method, url, body in self.scenarios(rng, options["prefix"]):
+                if options["only"] and name not in options["only"]:
+                    continue
+                results[name] = self.run_scenario(client, method, url, body, options["iterations"], options["warmup"])
+            transaction.set_rollback(True)
+
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        report = json.dumps({"commit": commit, "iterations": options["iterations"], "results": results}, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(report + "\n")
+        self.stdout.write(report)
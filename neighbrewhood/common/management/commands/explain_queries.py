@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from common.explain import QUERIES, Sample, check_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN ANALYZE the services' hot queries against the `seed_benchmark` dataset and "
+        "fail if any of them sequentially scans its main table or skips the index it should use."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="bench", help="Username prefix of the seeded brewers")
+        parser.add_argument(
+            "--force-index", action="store_true",
+            help="Disable sequential scans, for datasets too small for the planner to pick an index",
+        )
+
+    def handle(self, *args, **options):
+        sample = Sample.from_database(options["prefix"])
+        if sample is None:
+            raise CommandError("No seeded data found, run seed_benchmark first")
+
+        failures = check_queries(sample, force_index=options["force_index"])
+        for query in QUERIES:
+            problems = failures.get(query.name)
+            self.stdout.write(f"{query.name}: {'; '.join(problems) if problems else 'ok'}")
+        if failures:
+            raise CommandError(f"{len(failures)} queries don't use their indexes")
@@ -0,0 +1,44 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from brewswaps.models import SwapFeedRow
+from common.benchmark import seed_brewers, seed_claims, seed_giveaways, seed_qualities, seed_swaps
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a reproducible synthetic dataset for `manage.py bench`: brewers spread around "
+        "Sacramento, brews with qualities, swaps, claims and giveaways. Rows are committed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--brewers", type=int, default=2_000)
+        parser.add_argument("--swaps", type=int, default=20_000)
+        parser.add_argument("--claims", type=int, default=40_000)
+        parser.add_argument("--giveaways", type=int, default=500)
+        parser.add_argument("--qualities", type=int, default=12)
+        parser.add_argument("--live-fraction", type=float, default=0.8)
+        parser.add_argument("--radius", type=int, default=60, help="Spread of brewer locations in miles")
+        parser.add_argument("--prefix", default="bench", help="Username prefix of the seeded brewers")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        start = time.perf_counter()
+        with transaction.atomic():
+            qualities = seed_qualities(options["qualities"])
+            brewers = seed_brewers(rng, options["brewers"], prefix=options["prefix"], radius_mi=options["radius"])
+            swaps = seed_swaps(rng, brewers, options["swaps"], options["live_fraction"], qualities)
+            claims = seed_claims(rng, brewers, swaps, options["claims"], qualities=qualities)
+            giveaways = seed_giveaways(rng, brewers, options["giveaways"], qualities)
+            SwapFeedRow.objects.refresh([swap.id for swap in swaps])  # bulk_create skipped the feed signals
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.stdout.write(
+            f"Seeded {len(brewers)} brewers, {len(swaps)} swaps, {len(claims)} claims and "
+            f"{len(giveaways)} giveaways in {time.perf_counter() - start:.1f}s"
+        )
@@ -0,0 +1,201 @@
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels=""):
+        lines = []
+        cumulative = 0
+        bucket_labels = f"{labels}," if labels else ""
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{bucket_labels}le="{bound}"}} {cumulative}')
+        labels = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{labels} {self.sum}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = 0.0
+
+
+class QueryCounter:
+    """``connection.execute_wrapper`` that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """
+    Per-route request count, latency, SQL query count and SQL time, kept in process memory.
+    A scrape of /api/metrics reaches whichever worker serves it and reports that process
+    alone, so the numbers are only meaningful with a single worker process. With several,
+    successive scrapes read different workers and the counters look like they reset.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._routes = {}
+        self._histograms = {}
+        self._gauges = {}
+
+    def observe_value(self, name, value, buckets=LATENCY_BUCKETS):
+        """Add ``value`` to the process-wide histogram ``name``."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, route, seconds, queries=None, sql_seconds=0.0):
+        """``queries`` is None when they couldn't be counted (async views query from other threads)."""
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.requests += 1
+            stats.latency.observe(seconds)
+            if queries is not None:
+                stats.queries.observe(queries)
+            stats.sql_seconds += sql_seconds
+
+        threshold = getattr(settings, "METRICS_QUERY_THRESHOLD", None)
+        if threshold is not None and queries is not None and queries > threshold:
+            logger.warning("%s ran %d SQL queries (threshold %d) in %.1f ms", route, queries, threshold, seconds * 1000)
+
+    def render(self):
+        """
+        The registry in the Prometheus text exposition format. Each metric family is written
+        in one block, its TYPE line followed by the samples of every route.
+        """
+        lines = []
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines.append("# TYPE neighbrewhood_requests_total counter")
+            for route, stats in routes:
+                lines.append(f'neighbrewhood_requests_total{{route="{route}"}} {stats.requests}')
+            lines.append("# TYPE neighbrewhood_request_seconds histogram")
+            for route, stats in routes:
+                lines.extend(stats.latency.render("neighbrewhood_request_seconds", f'route="{route}"'))
+            lines.append("# TYPE neighbrewhood_request_queries histogram")
+            for route, stats in routes:
+                lines.extend(stats.queries.render("neighbrewhood_request_queries", f'route="{route}"'))
+            lines.append("# TYPE neighbrewhood_sql_seconds_total counter")
+            for route, stats in routes:
+                lines.append(f'neighbrewhood_sql_seconds_total{{route="{route}"}} {stats.sql_seconds}')
+            for name, histogram in sorted(self._histograms.items()):
+                lines.append(f"# TYPE neighbrewhood_{name} histogram")
+                lines.extend(histogram.render(f"neighbrewhood_{name}"))
+            for name, value in sorted(self._gauges.items()):
+                lines.append(f"# TYPE neighbrewhood_{name} gauge")
+                lines.append(f"neighbrewhood_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def route_name(request, default="unresolved"):
+    match = getattr(request, "resolver_match", None)
+    return (match and match.url_name) or default
+
+
+@contextmanager
+def measure(request, default_route="unresolved"):
+    counter = QueryCounter()
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(counter):
+            yield
+    finally:
+        metrics.observe(route_name(request, default_route), time.perf_counter() - start, counter.count, counter.seconds)
+
+
+class MetricsMiddleware:
+    """
+    Records every request, including time spent in other middleware and non-ninja views.
+    When installed, the ninja hook below stands down so requests aren't counted twice.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._metrics_middleware = True
+        with measure(request):
+            return self.get_response(request)
+
+
+def ninja_metrics(run):
+    """
+    ``api.add_decorator(ninja_metrics, mode="view")``: records each ninja operation, from
+    authentication to serialization, while METRICS_ENABLED is set. Async operations record
+    latency only: their queries run on sync_to_async threads, out of the wrapper's reach.
+    """
+    if iscoroutinefunction(run):
+        @wraps(run)
+        async def ameasured(request, *args, **kwargs):
+            if not settings.METRICS_ENABLED or getattr(request, "_metrics_middleware", False):
+                return await run(request, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await run(request, *args, **kwargs)
+            finally:
+                metrics.observe(route_name(request, getattr(run, "__name__", "unresolved")), time.perf_counter() - start)
+        return ameasured
+
+    @wraps(run)
+    def measured(request, *args, **kwargs):
+        if not settings.METRICS_ENABLED or getattr(request, "_metrics_middleware", False):
+            return run(request, *args, **kwargs)
+        with measure(request, getattr(run, "__name__", "unresolved")):
+            return run(request, *args, **kwargs)
+    return measured
@@ -0,0 +1,161 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from django.contrib.gis.measure import Distance
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import FloatField, IntegerField, Q
+from ninja import Field, Schema
+from ninja.conf import settings
+from ninja.errors import HttpError
+from ninja.pagination import PaginationBase
+from typing import Any, List, Optional
+
+
+def _cursor_default(value):
+    # Full precision isoformat: DjangoJSONEncoder drops microseconds, which would skip rows.
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Distance):
+        return value.m
+    raise TypeError(f"Can't use {type(value).__name__} in a cursor")
+
+
+def _ordering_field(queryset, name):
+    """The model field or annotation output field a cursor value is compared against."""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    try:
+        field = queryset.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise ValueError(f"Can't page {queryset.model.__name__} by {name}")
+    return getattr(field, "target_field", field)  # Compare foreign keys by the referenced key
+
+
+class KeysetPagination(PaginationBase):
+    """
+    Cursor pagination over a fixed, unique ordering such as ("-created", "-id").
+
+    The next page is selected with a WHERE on the last row's ordering values instead of an
+    OFFSET, so deep pages cost the same as the first one. The total count is only computed
+    when the client asks for it with ``count=true``.
+
+    Usage: ``@paginate(KeysetPagination)`` or ``@paginate(KeysetPagination, ordering=("distance", "id"))``
+
+    Views that can sort several ways pass ``orderings``, mapping values of their
+    ``ordering_param`` argument to alternative orderings; anything else uses ``ordering``.
+    """
+
+    class Input(Schema):
+        limit: int = Field(settings.PAGINATION_PER_PAGE, ge=1)
+        cursor: Optional[str] = None
+        count: bool = False
+
+    class Output(Schema):
+        items: List[Any]
+        next: Optional[str] = None
+        count: Optional[int] = None
+
+    def __init__(
+        self,
+        ordering=("-created", "-id"),
+        orderings=None,
+        ordering_param="order",
+        max_limit=settings.PAGINATION_MAX_LIMIT,
+        **kwargs,
+    ):
+        self.ordering = tuple(ordering)
+        self.orderings = {key: tuple(value) for key, value in (orderings or {}).items()}
+        self.ordering_param = ordering_param
+        self.max_limit = max_limit
+        super().__init__(**kwargs)
+
+    def ordering_for(self, params):
+        """The ordering selected by the view's ``ordering_param`` argument."""
+        return self.orderings.get(params.get(self.ordering_param), self.ordering)
+
+    def encode_cursor(self, obj, ordering=None):
+        ordering = ordering or self.ordering
+        values = [getattr(obj, field.lstrip("-")) for field in ordering]
+        raw = json.dumps(values, default=_cursor_default)
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor, ordering=None):
+        ordering = ordering or self.ordering
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise HttpError(400, "Invalid cursor")
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise HttpError(400, "Invalid cursor")
+        return values
+
+    def cursor_values(self, queryset, values, ordering=None):
+        """
+        Convert decoded cursor values to their ordering fields' types, rejecting any that
+        _cursor_default couldn't have written: numbers for numeric fields, strings otherwise.
+        """
+        ordering = ordering or self.ordering
+        converted = []
+        for field_name, value in zip(ordering, values):
+            field = _ordering_field(queryset, field_name.lstrip("-"))
+            numeric = isinstance(field, (FloatField, IntegerField))
+            expected = (int, float) if numeric else str
+            if isinstance(value, bool) or not isinstance(value, expected):
+                raise HttpError(400, "Invalid cursor")
+            try:
+                converted.append(field.to_python(value))
+            except (ValidationError, TypeError, ValueError):
+                raise HttpError(400, "Invalid cursor")
+        return converted
+
+    def after(self, values, ordering=None):
+        """Rows strictly after ``values`` in this ordering, as a row-value comparison spelled out in Qs."""
+        ordering = ordering or self.ordering
+        query = Q()
+        for i, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition = Q(**{f"{field.lstrip('-')}__{lookup}": values[i]})
+            for prev_field, prev_value in zip(ordering[:i], values[:i]):
+                condition &= Q(**{prev_field.lstrip("-"): prev_value})
+            query |= condition
+        return query
+
+    def _page_query(self, queryset, pagination, ordering):
+        queryset = queryset.order_by(*ordering)
+        page = queryset
+        if pagination.cursor:
+            values = self.cursor_values(queryset, self.decode_cursor(pagination.cursor, ordering), ordering)
+            page = page.filter(self.after(values, ordering))
+        return queryset, page
+
+    def paginate_queryset(self, queryset, pagination: Input, **params):
+        limit = min(pagination.limit, self.max_limit)
+        ordering = self.ordering_for(params)
+        queryset, page = self._page_query(queryset, pagination, ordering)
+        count = queryset.count() if pagination.count else None
+        items = list(page[:limit + 1])  # One extra row tells us whether there is a next page
+        return self._page(items, limit, count, ordering)
+
+    async def apaginate_queryset(self, queryset, pagination: Input, **params):
+        limit = min(pagination.limit, self.max_limit)
+        ordering = self.ordering_for(params)
+        queryset, page = self._page_query(queryset, pagination, ordering)
+        count = await queryset.acount() if pagination.count else None
+        items = [obj async for obj in page[:limit + 1]]  # Runs prefetch_related too
+        return self._page(items, limit, count, ordering)
+
+    def _page(self, items, limit, count, ordering):
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = self.encode_cursor(items[-1], ordering)
+
+        return {
+            "items": items,
+            "next": next_cursor,
+            "count": count,
+        }
@@ -1,21 +1,31 @@
+import json
 from collections import Iterable
+from io import StringIO
+
 from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
 from brewers.models import Brewer
+from brewswaps.models import BrewSwap
 from brews.models import Brew, BrewType, Quality
+from common.lookups import LookupTable
+from common.db import warm_up_database
+from common.explain import ExplainedQuery, Sample, check_queries
+from common.metrics import MetricsRegistry, metrics
 
 
 class ModelTestBase(TestCase):
     def setUp(self):
         super().setUp()
+        LookupTable.bump_all()  # Rows cached by an earlier test were rolled back without a signal
         User = get_user_model()
         self.user = User.objects.create(username="test")
 
     def create_brewer(self):
-        loc = Point(38.518681, -121.498772)
+        loc = Point(-121.498772, 38.518681)
         brewer = Brewer(
             creator = self.user,
             user = self.user,
@@ -60,3 +70,63 @@ class ModelTestBase(TestCase):
         brew.save()
         brew.qualities.set(qlty_objs)
         return brew
+
+
+class MetricsTestCase(TestCase):
+    def test_render_groups_families(self):
+        registry = MetricsRegistry()
+        registry.observe("brews", 0.01, queries=2)
+        registry.observe("swaps", 0.2, queries=3)
+        lines = registry.render().splitlines()
+
+        # Every family is one contiguous block that starts with its TYPE line
+        families = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+        self.assertEqual(len(families), len(set(families)))
+        family = None
+        for line in lines:
+            if line.startswith("# TYPE"):
+                family = line.split()[2]
+            else:
+                self.assertTrue(line.startswith(family), line)
+        self.assertEqual(
+            [line for line in lines if line.startswith("neighbrewhood_requests_total")],
+            ['neighbrewhood_requests_total{route="brews"} 1', 'neighbrewhood_requests_total{route="swaps"} 1'],
+        )
+
+    def test_db_warmup_metrics(self):
+        metrics.clear()
+        warm_up_database(samples=2)
+        body = metrics.render()
+        self.assertIn("neighbrewhood_db_warmup_seconds ", body)
+        self.assertIn("neighbrewhood_db_connection_acquire_seconds_count ", body)
+
+
+class ExplainQueriesTestCase(ModelTestBase):
+    def test_queries_use_indexes(self):
+        call_command(
+            "seed_benchmark", "--brewers=30", "--swaps=60", "--claims=120", "--giveaways=20",
+            "--prefix=explain", stdout=StringIO(),
+        )
+        call_command("explain_queries", "--prefix=explain", "--force-index", stdout=StringIO())
+
+        # A primary key lookup never touches the index it claims to need
+        by_pk = ExplainedQuery(
+            "by_pk", ["brewswaps_brewswap"], ["brewswap_created_idx"],
+            lambda s: BrewSwap.objects.filter(pk=s.swap_id),
+        )
+        failures = check_queries(Sample.from_database("explain"), [by_pk], force_index=True)
+        self.assertEqual(failures, {"by_pk": ["doesn't use brewswap_created_idx"]})
+
+
+class BenchTestCase(ModelTestBase):
+    def test_bench_scenarios(self):
+        call_command(
+            "seed_benchmark", "--brewers=10", "--swaps=20", "--claims=40", "--giveaways=10",
+            "--prefix=bench", stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command("bench", "--iterations=2", "--warmup=0", stdout=out)
+        results = json.loads(out.getvalue())["results"]
+        self.assertIn("giveaways_clusters", results)
+        for name, result in results.items():
+            self.assertFalse([code for code in result["statuses"] if code.startswith("5")], name)
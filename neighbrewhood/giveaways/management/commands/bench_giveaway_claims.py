@@ -0,0 +1,81 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from brews.models import Brew, BrewType
+from common.benchmark import seed_brewers, summarize
+from giveaways.models import Claim, Giveaway
+
+
+class Command(BaseCommand):
+    help = (
+        "Have N brewers claim from one giveaway in parallel and report latency, throughput "
+        "and whether the giveaway was oversubscribed. Claims need real commits to contend, "
+        "so the seeded rows are deleted afterwards rather than rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--claimers", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=16)
+        parser.add_argument("--bottles", type=int, default=100)
+        parser.add_argument("--per-claim", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        brewers = seed_brewers(rng, options["claimers"] + 1, prefix=f"bench_giveaway_{int(time.time())}")
+        owner, claimers = brewers[0], brewers[1:]
+        brew_type, _ = BrewType.objects.get_or_create(value="Benchmark Ale")
+        brew = Brew.objects.create(creator=owner.user, brew_type=brew_type)
+        giveaway = Giveaway.objects.create(
+            creator=owner.user,
+            brewer=owner,
+            brew=brew,
+            bottles_available=options["bottles"],
+            max_increment=options["per_claim"],
+            location=owner.location,
+            status=Giveaway.StatusChoices.OPEN,
+        )
+
+        def claim(claimer):
+            start = time.perf_counter()
+            try:
+                Claim(
+                    creator=claimer.user,
+                    claimer=claimer,
+                    giveaway_id=giveaway.id,
+                    num_bottles=options["per_claim"],
+                ).save()
+                ok = True
+            except ValidationError:
+                ok = False
+            finally:
+                connection.close()
+            return ok, time.perf_counter() - start
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                results = list(pool.map(claim, claimers))
+            elapsed = time.perf_counter() - start
+
+            giveaway.refresh_from_db()
+            claimed = Claim.objects.filter(giveaway=giveaway).aggregate(s=Sum("num_bottles"))["s"] or 0
+            stats = summarize([latency for _, latency in results])
+            self.stdout.write(f"claimers      {len(claimers)} on {options['workers']} workers")
+            self.stdout.write(f"accepted      {sum(ok for ok, _ in results)}")
+            self.stdout.write(f"rejected      {sum(not ok for ok, _ in results)}")
+            self.stdout.write(f"throughput    {len(results) / elapsed:.1f} claims/s")
+            self.stdout.write(f"latency       p50 {stats['p50_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms")
+            self.stdout.write(f"claimed       {claimed}/{giveaway.bottles_available} (counter {giveaway.bottles_claimed})")
+            if claimed > giveaway.bottles_available or claimed != giveaway.bottles_claimed:
+                raise CommandError("Giveaway was oversubscribed or its counter drifted")
+        finally:
+            brew.delete()
+            get_user_model().objects.filter(id__in=[b.user_id for b in brewers]).delete()
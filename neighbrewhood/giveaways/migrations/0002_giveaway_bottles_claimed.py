@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_bottles_claimed(apps, schema_editor):
+    Giveaway = apps.get_model("giveaways", "Giveaway")
+    Claim = apps.get_model("giveaways", "Claim")
+    claimed = (
+        Claim.objects.filter(giveaway=OuterRef("pk"))
+        .values("giveaway")
+        .annotate(total=Sum("num_bottles"))
+        .values("total")
+    )
+    Giveaway.objects.update(bottles_claimed=Coalesce(Subquery(claimed), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giveaways', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='giveaway',
+            name='bottles_claimed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_bottles_claimed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giveaways', '0002_giveaway_bottles_claimed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='giveaway',
+            index=django.contrib.postgres.indexes.GistIndex(django.db.models.functions.comparison.Cast('location', output_field=django.contrib.gis.db.models.fields.PointField(geography=True, srid=4326)), condition=models.Q(('status', 'open')), name='giveaway_open_geog_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giveaways', '0003_giveaway_open_geog_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='claim',
+            name='num_bottles',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
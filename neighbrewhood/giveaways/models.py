@@ -1,12 +1,50 @@
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GistIndex
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.contrib.gis.db.models.functions import SnapToGrid
+from django.db.models import Count, F, Sum
 
 from brewers.models import Brewer
 from brews.models import Brew
+from common.gis import KNNDistance, as_geography, as_wgs84
 from common.models import CommonInfo
 
 
+class GiveawayQuerySet(models.QuerySet):
+    def open(self):
+        return self.filter(status=Giveaway.StatusChoices.OPEN)
+
+    def nearby(self, point, distance):
+        """
+        Giveaways within ``distance`` (a D measure) of ``point``, annotated with ``distance``
+        in meters. Both go through the geography cast, so on open giveaways the radius search
+        and ordering by ``distance`` use giveaway_open_geog_idx.
+        """
+        point = as_wgs84(point)
+        return (
+            self.annotate(geog=as_geography("location"))
+            .filter(geog__dwithin=(point, distance))
+            .annotate(distance=KNNDistance("geog", point))
+        )
+
+    def clusters(self, bbox, cell_size):
+        """
+        One row per grid cell of ``cell_size`` degrees holding giveaways inside the ``bbox``
+        polygon, grouped in the database: ``cell`` (the grid point the cell is centered
+        on), ``count`` and ``remaining_bottles``. A cell with one giveaway still places it
+        within half a cell, so callers must keep ``cell_size`` coarse.
+        """
+        return (
+            self.filter(location__within=bbox)
+            .annotate(cell=SnapToGrid("location", cell_size))
+            .values("cell")
+            .annotate(count=Count("id"), remaining_bottles=Sum(F("bottles_available") - F("bottles_claimed")))
+            .order_by()
+        )
+
+
 class Giveaway(CommonInfo):
     class StatusChoices(models.TextChoices):
         PENDING = "pending"
@@ -23,12 +61,18 @@ class Giveaway(CommonInfo):
     location = models.PointField()  ## For searching. Will not be displayed to drinkers
     status = models.CharField(choices=StatusChoices.choices, default=StatusChoices.PENDING)
 
-    @property
-    def bottles_claimed(self):
-        num = self.claim_set.aggregate(s=models.Sum("num_bottles"))["s"]
-        if num is None:
-            num = 0
-        return num
+    bottles_claimed = models.IntegerField(default=0)  ## Kept in step by Claim.save/delete
+
+    objects = GiveawayQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GistIndex(  ## Meter-based search over open giveaways
+                as_geography("location"),
+                name="giveaway_open_geog_idx",
+                condition=models.Q(status="open"),
+            ),
+        ]
 
     @property
     def remaining_bottles(self):
@@ -39,14 +83,27 @@ class Giveaway(CommonInfo):
             raise ValidationError("Max increment cannot be larger than available bottles")
         
     def save(self, *args, **kwargs):
+        """
+        Save, leaving ``bottles_claimed`` alone on existing rows: it only moves through the
+        claims' conditional updates, and this instance's copy may predate some of them.
+        """
         self._validate_max_increment()
+        if not self._state.adding:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                update_fields = [f.attname for f in self._meta.concrete_fields if not f.primary_key]
+            kwargs["update_fields"] = [f for f in update_fields if f != "bottles_claimed"]
         return super().save(*args, **kwargs)
 
 
 class Claim(CommonInfo):
     claimer = models.ForeignKey(Brewer, on_delete=models.CASCADE)
     giveaway = models.ForeignKey(Giveaway, on_delete=models.CASCADE)
-    num_bottles = models.IntegerField()
+    num_bottles = models.IntegerField(validators=[MinValueValidator(1)])
+
+    def _validate_positive(self):
+        if self.num_bottles < 1:
+            raise ValidationError("Claim must be for at least one bottle")
 
     def _validate_num_bottles(self):
         if self.num_bottles > self.giveaway.max_increment:
@@ -56,7 +113,33 @@ class Claim(CommonInfo):
         if self.num_bottles > self.giveaway.remaining_bottles:
             raise ValidationError("Not nough remaining bottles")
         
-    def save(self, *args, **kwargs):
+    def _reserve_bottles(self, num_bottles):
+        """
+        Add ``num_bottles`` to the giveaway's claimed count with one conditional UPDATE, so the
+        limits are checked against the locked row and concurrent claimers can't oversubscribe.
+        """
+        giveaways = Giveaway.objects.filter(pk=self.giveaway_id)
+        if num_bottles > 0:
+            giveaways = giveaways.filter(
+                max_increment__gte=self.num_bottles,
+                bottles_claimed__lte=F("bottles_available") - num_bottles,
+            )
+        if giveaways.update(bottles_claimed=F("bottles_claimed") + num_bottles):
+            return
+
+        # Work out which limit we hit from the current row
+        self.giveaway.refresh_from_db(fields=["bottles_available", "bottles_claimed", "max_increment"])
         self._validate_num_bottles()
         self._validate_enough_remaining()
-        return super().save(*args, **kwargs)
+        raise ValidationError("Could not reserve bottles")
+
+    def save(self, *args, **kwargs):
+        self._validate_positive()  # A zero or negative claim would hand bottles back
+        with transaction.atomic():
+            if self._state.adding:
+                self._reserve_bottles(self.num_bottles)
+            else:
+                previous = Claim.objects.select_for_update().values_list("num_bottles", flat=True).get(pk=self.pk)
+                if previous != self.num_bottles:
+                    self._reserve_bottles(self.num_bottles - previous)
+            return super().save(*args, **kwargs)
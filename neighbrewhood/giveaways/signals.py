@@ -0,0 +1,10 @@
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Claim, Giveaway
+
+
+@receiver(post_delete, sender=Claim)
+def release_claimed_bottles(sender, instance, **kwargs):
+    Giveaway.objects.filter(pk=instance.giveaway_id).update(bottles_claimed=F("bottles_claimed") - instance.num_bottles)
@@ -83,3 +83,19 @@ class GiveawaysTestCase(ModelTestBase):
             claim1.save()
             claim2 = self.create_claim(giveaway, claim_num=claim_num)
             claim2.save()
+
+    def test_claim_counter(self):
+        giveaway = self.create_basic_giveaway(bottles_avail=10, max_incr=4)
+        giveaway.save()
+
+        claim = self.create_claim(giveaway, claim_num=4)
+        claim.save()
+        claim.num_bottles = 2
+        claim.save()
+        giveaway.refresh_from_db()
+        self.assertEqual(giveaway.bottles_claimed, 2)
+
+        claim.delete()
+        giveaway.refresh_from_db()
+        self.assertEqual(giveaway.bottles_claimed, 0)
+        self.assertEqual(giveaway.remaining_bottles, 10)
@@ -1,20 +1,33 @@
+from django.conf import settings
+from django.http import HttpResponse
+from ninja.errors import HttpError
 from ninja_jwt.authentication import JWTAuth
 from ninja_jwt.controller import NinjaJWTDefaultController
 from ninja_extra import NinjaExtraAPI
 
+from common.metrics import metrics, ninja_metrics
+from services.asyncservice.api import async_router
 from services.brewservice.api import brew_router
 from services.claimservice.api import claims_router
+from services.common.schemas_api import schemas_router
+from services.giveawayservice.api import giveaway_router
+from services.ratingservice.api import ratings_router
 from services.swapservice.api import swap_router
 from services.users.api import users_router
 
 
 api = NinjaExtraAPI()
 api.register_controllers(NinjaJWTDefaultController)
+api.add_decorator(ninja_metrics, mode="view")
 
 api.add_router('/users', users_router)
 api.add_router('/brews/', brew_router)
 api.add_router('/swaps/', swap_router)
 api.add_router('/claims/', claims_router)
+api.add_router('/giveaways/', giveaway_router)
+api.add_router('/ratings/', ratings_router)
+api.add_router('/schemas/', schemas_router)
+api.add_router('/async/', async_router)
 
 @api.get("/hello")
 def hello(request):
@@ -24,3 +37,9 @@ def hello(request):
 @api.get("/auth_hello", auth=JWTAuth())
 def auth_hello(request):
     return "Authorized hello world"
+
+@api.get("/metrics", include_in_schema=False, url_name="metrics")
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise HttpError(404, "Metrics are disabled")
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4")
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -36,6 +37,7 @@ DEFAULT_APPS = [
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.gis',
+    'django.contrib.postgres',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
@@ -50,7 +52,10 @@ CUSTOM_APPS = [
     'brewswaps',
     'giveaways',
     'ratings',
+    'services.asyncservice',
     'services.brewservice',
+    'services.giveawayservice',
+    'services.ratingservice',
     'services.users',
 ]
 
@@ -91,17 +96,49 @@ WSGI_APPLICATION = 'neighbrewhood.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connection reuse is configured from the environment:
+#   DB_CONN_MAX_AGE        seconds to keep a connection open between requests (0, the default,
+#                          closes it after each request)
+#   DB_CONN_HEALTH_CHECKS  ping reused connections before a request uses them
+#   DB_POOL                "1" to pool connections with psycopg 3's pool instead (needs psycopg[pool])
+#   DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+# Pooled and persistent connections are mutually exclusive, so DB_POOL forces CONN_MAX_AGE to 0.
+# Persistent connections belong to the thread that opened them. Under ASGI, sync code runs on
+# a changing set of executor threads, so each one would hold its own idle connection.
+# Only set DB_CONN_MAX_AGE (e.g. 60) for WSGI workers without DB_POOL.
+
+def env_flag(name, default=False):
+    return os.environ.get(name, "1" if default else "0").lower() in ("1", "true", "yes", "on")
+
+DB_POOL = env_flag("DB_POOL")
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.contrib.gis.db.backends.postgis',
-        'NAME': 'gis',
-        'USER': 'user001',
-        'PASSWORD': '123456789',
-        'HOST': 'localhost',
-        'PORT': '5432'
+        'NAME': os.environ.get('DB_NAME', 'gis'),
+        'USER': os.environ.get('DB_USER', 'user001'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', '123456789'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': env_flag('DB_CONN_HEALTH_CHECKS', default=True),
+        'OPTIONS': {},
     }
 }
 
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+
+# Fill the DB_POOL pool when the server starts (wsgi.py / asgi.py) and time it for /api/metrics.
+# Ignored without DB_POOL: a connection opened at import belongs to the importing thread,
+# which under ASGI never serves a request.
+DB_WARMUP = env_flag('DB_WARMUP')
+DB_WARMUP_SAMPLES = int(os.environ.get('DB_WARMUP_SAMPLES', 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -143,3 +180,42 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Brewer profile cache
+# Seconds BrewerJWTAuth may reuse a user + brewer lookup in-process. 0 disables it.
+
+BREWER_PROFILE_CACHE_TTL = 0
+
+
+# JWT
+# Embed brewer claims in issued tokens so StatelessBrewerJWTAuth can skip the user lookup.
+
+NINJA_JWT = {
+    "TOKEN_OBTAIN_PAIR_INPUT_SCHEMA": "services.common.auth.BrewerTokenObtainPairInputSchema",
+}
+
+
+# Lookup tables
+# Cache alias holding the BrewType / Quality lookup versions, so every process reloads together.
+# None keeps the version per process.
+
+LOOKUP_CACHE_ALIAS = None
+
+
+# Metrics
+# Per-route request, latency and SQL query metrics, served at /api/metrics when enabled.
+# Add 'common.metrics.MetricsMiddleware' to MIDDLEWARE to also time the middleware stack.
+# Requests running more than METRICS_QUERY_THRESHOLD queries are logged. None disables that.
+# The numbers are per process: only enable the endpoint for single-worker deployments.
+
+METRICS_ENABLED = False
+METRICS_QUERY_THRESHOLD = None
+
+
+# Detail response cache
+# Cache alias for serialized swap, brew and claim detail bodies, keyed by their ETag.
+# None disables it; conditional GETs work either way.
+
+RESPONSE_CACHE_ALIAS = None
+RESPONSE_CACHE_TIMEOUT = 300
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'neighbrewhood.settings')
 
 application = get_wsgi_application()
+
+# Runs in each worker process as it imports this module (don't combine with gunicorn --preload,
+# which would open the connections in the master and share them across forks)
+if settings.DB_WARMUP and settings.DB_POOL:
+    from common.db import warm_up_database
+    warm_up_database()
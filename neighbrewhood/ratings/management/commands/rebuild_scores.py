@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from ratings.models import BrewerScore, BrewScore
+
+
+class Command(BaseCommand):
+    help = "Rebuild the brewer and brew score tables from their ratings."
+
+    def handle(self, *args, **options):
+        for model in (BrewerScore, BrewScore):
+            written = model.objects.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} {model._meta.verbose_name}(s)"))
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+from ratings.models import wilson_lower_bound
+
+
+def backfill_scores(apps, schema_editor):
+    for score_name, rating_name, field in (
+        ("BrewerScore", "BrewerRating", "brewer"),
+        ("BrewScore", "BrewRating", "brew"),
+    ):
+        Score = apps.get_model("ratings", score_name)
+        Rating = apps.get_model("ratings", rating_name)
+        counts = (
+            Rating.objects.values(field)
+            .annotate(up=Count("id", filter=Q(rating=True)), down=Count("id", filter=Q(rating=False)))
+            .order_by()
+        )
+        Score.objects.bulk_create(
+            [
+                Score(
+                    **{f"{field}_id": row[field]},
+                    up=row["up"],
+                    down=row["down"],
+                    score=wilson_lower_bound(row["up"], row["down"]),
+                )
+                for row in counts
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brewers', '0002_brewer_geog_idx'),
+        ('brews', '0002_brew_indexes'),
+        ('ratings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BrewerScore',
+            fields=[
+                ('up', models.IntegerField(default=0)),
+                ('down', models.IntegerField(default=0)),
+                ('score', models.FloatField(default=0.0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('brewer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='brewers.brewer')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BrewScore',
+            fields=[
+                ('up', models.IntegerField(default=0)),
+                ('down', models.IntegerField(default=0)),
+                ('score', models.FloatField(default=0.0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('brew', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='brews.brew')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
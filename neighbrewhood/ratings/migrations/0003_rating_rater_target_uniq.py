@@ -0,0 +1,62 @@
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+from ratings.models import wilson_lower_bound
+
+
+def remove_duplicate_ratings(apps, schema_editor):
+    """Keep each rater's latest rating of a target and recount the targets that lost any."""
+    for score_name, rating_name, field in (
+        ("BrewerScore", "BrewerRating", "brewer"),
+        ("BrewScore", "BrewRating", "brew"),
+    ):
+        Score = apps.get_model("ratings", score_name)
+        Rating = apps.get_model("ratings", rating_name)
+        duplicated = (
+            Rating.objects.values("rater", field)
+            .annotate(n=Count("id"))
+            .filter(n__gt=1)
+            .order_by()
+        )
+        targets = set()
+        for row in duplicated:
+            ratings = Rating.objects.filter(rater=row["rater"], **{field: row[field]}).order_by("-updated", "-id")
+            Rating.objects.filter(id__in=list(ratings.values_list("id", flat=True)[1:])).delete()
+            targets.add(row[field])
+        if not targets:
+            continue
+
+        counts = (
+            Rating.objects.filter(**{f"{field}__in": targets})
+            .values(field)
+            .annotate(up=Count("id", filter=Q(rating=True)), down=Count("id", filter=Q(rating=False)))
+            .order_by()
+        )
+        for row in counts:
+            Score.objects.update_or_create(
+                **{f"{field}_id": row[field]},
+                defaults={
+                    "up": row["up"],
+                    "down": row["down"],
+                    "score": wilson_lower_bound(row["up"], row["down"]),
+                },
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ratings', '0002_brewerscore_brewscore'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_ratings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='brewerrating',
+            constraint=models.UniqueConstraint(fields=('rater', 'brewer'), name='brewerrating_rater_brewer_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='brewrating',
+            constraint=models.UniqueConstraint(fields=('rater', 'brew'), name='brewrating_rater_brew_uniq'),
+        ),
+    ]
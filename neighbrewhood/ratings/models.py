@@ -1,13 +1,112 @@
+import math
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from brewers.models import Brewer
 from brews.models import Brew
 from common.models import CommonInfo
 
 
+def wilson_lower_bound(up, down, z=1.96):
+    """
+    Lower bound of the 95% Wilson score interval for the share of thumbs up. Ranks a few
+    unanimous ratings below many mostly-positive ones, unlike the plain ratio.
+    """
+    n = up + down
+    if n == 0:
+        return 0.0
+    p = up / n
+    return (p + z * z / (2 * n) - z * math.sqrt((p * (1 - p) + z * z / (4 * n)) / n)) / (1 + z * z / n)
+
+
+class ScoreQuerySet(models.QuerySet):
+    def apply(self, target_id, up=0, down=0, create=True):
+        """
+        Add ``up``/``down`` to ``target_id``'s counts and recompute its score. The row is
+        locked for the update, so concurrent raters of the same target queue up instead
+        of losing increments. With ``create`` False a missing row is left alone.
+        """
+        field = self.model.target_field
+        with transaction.atomic():
+            if create:
+                self.bulk_create([self.model(**{f"{field}_id": target_id})], ignore_conflicts=True)
+            score = self.select_for_update().filter(**{f"{field}_id": target_id}).first()
+            if score is None:
+                return None
+            score.up += up
+            score.down += down
+            score.score = wilson_lower_bound(score.up, score.down)
+            score.save(update_fields=["up", "down", "score", "updated"])
+        return score
+
+    def rebuild(self):
+        """Recompute every row from the rating table. Returns the number of rows written."""
+        field = self.model.target_field
+        ratings = self.model.ratings
+        target = self.model._meta.get_field(field).related_model
+        counts = list(
+            target.objects.filter(**{f"{ratings}__isnull": False})
+            .values("pk")
+            .annotate(
+                up=models.Count(ratings, filter=models.Q(**{f"{ratings}__rating": True})),
+                down=models.Count(ratings, filter=models.Q(**{f"{ratings}__rating": False})),
+            )
+            .order_by()
+        )
+        rows = [
+            self.model(
+                **{f"{field}_id": row["pk"]},
+                up=row["up"],
+                down=row["down"],
+                score=wilson_lower_bound(row["up"], row["down"]),
+            )
+            for row in counts
+        ]
+        with transaction.atomic():
+            self.exclude(**{f"{field}_id__in": [row["pk"] for row in counts]}).delete()
+            self.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=[field],
+                update_fields=["up", "down", "score", "updated"],
+            )
+        return len(rows)
+
+
+class Score(models.Model):
+    """
+    Thumbs up/down counts for one brewer or brew with their Wilson lower bound, kept in
+    step by Rating.save and the post_delete signal in ratings.signals.
+    Run ``manage.py rebuild_scores`` to repair drift.
+    """
+    up = models.IntegerField(default=0)
+    down = models.IntegerField(default=0)
+    score = models.FloatField(default=0.0)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = ScoreQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+
+class BrewerScore(Score):
+    target_field = "brewer"
+    ratings = "brewer_ratings"
+
+    brewer = models.OneToOneField(Brewer, on_delete=models.CASCADE, primary_key=True, related_name="score")
+
+
+class BrewScore(Score):
+    target_field = "brew"
+    ratings = "brew_ratings"
+
+    brew = models.OneToOneField(Brew, on_delete=models.CASCADE, primary_key=True, related_name="score")
+
+
 class Rating(CommonInfo):
     rater = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     rating = models.BooleanField()
@@ -16,10 +115,44 @@ class Rating(CommonInfo):
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        """Save, moving the target's score by the change in thumbs in the same transaction."""
+        with transaction.atomic():
+            up = down = 0
+            if self._state.adding:
+                previous = None
+            else:
+                previous = type(self).objects.select_for_update().values_list("rating", flat=True).get(pk=self.pk)
+            if previous != self.rating:
+                if previous is not None:
+                    up, down = (-1, 0) if previous else (0, -1)
+                up, down = (up + 1, down) if self.rating else (up, down + 1)
+            super().save(*args, **kwargs)
+            if up or down:
+                self.score_model.objects.apply(self.target_id, up, down)
+
+    @property
+    def target_id(self):
+        return getattr(self, f"{self.score_model.target_field}_id")
+
 
 class BrewerRating(Rating):
+    score_model = BrewerScore
+
     brewer = models.ForeignKey(Brewer, on_delete=models.CASCADE, related_name="brewer_ratings")
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["rater", "brewer"], name="brewerrating_rater_brewer_uniq"),
+        ]
+
 
 class BrewRating(Rating):
+    score_model = BrewScore
+
     brew = models.ForeignKey(Brew, on_delete=models.CASCADE, related_name="brew_ratings")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["rater", "brew"], name="brewrating_rater_brew_uniq"),
+        ]
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import BrewerRating, BrewRating
+
+
+@receiver(post_delete, sender=BrewerRating)
+@receiver(post_delete, sender=BrewRating)
+def rating_deleted(sender, instance, **kwargs):
+    """Take the rating back out of its target's score, also on queryset and cascade deletes."""
+    up, down = (-1, 0) if instance.rating else (0, -1)
+    # Don't recreate a score that the same cascade already deleted along with its target
+    instance.score_model.objects.apply(instance.target_id, up, down, create=False)
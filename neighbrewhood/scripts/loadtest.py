@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Concurrent load test comparing the WSGI deployment with ASGI (uvicorn), including the async
+read endpoints under /api/async/. Standard library only; start the servers first, e.g.
+
+    gunicorn neighbrewhood.wsgi:application --workers 4 --threads 8 --bind 127.0.0.1:8000
+    uvicorn neighbrewhood.asgi:application --workers 4 --port 8001
+
+then, with a token for a brewer from `seed_benchmark`:
+
+    python scripts/loadtest.py --wsgi http://127.0.0.1:8000 --asgi http://127.0.0.1:8001 --token <access>
+
+Prints a JSON report of throughput and latency percentiles per deployment and endpoint.
+"""
+import argparse
+import json
+import math
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# (name, sync path, async path)
+ENDPOINTS = [
+    ("swaps", "/api/swaps/", "/api/async/swaps/"),
+    ("my_swaps", "/api/swaps/mySwaps", "/api/async/swaps/mySwaps"),
+    ("nearby_swaps", "/api/swaps/nearbySwaps", "/api/async/swaps/nearbySwaps"),
+    ("my_claims", "/api/claims/user/myClaims", "/api/async/claims/user/myClaims"),
+    ("brews", "/api/brews/", "/api/async/brews/"),
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def fetch(url, token):
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return time.perf_counter() - start, status
+
+
+def run(url, token, concurrency, requests):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda _: fetch(url, token), range(requests)))
+        elapsed = time.perf_counter() - started
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, status in results if status != 200)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wsgi", required=True, help="Base URL of the WSGI deployment")
+    parser.add_argument("--asgi", required=True, help="Base URL of the ASGI deployment")
+    parser.add_argument("--token", required=True, help="Access token for a user with a brewer profile")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--only", nargs="+", help="Run only these endpoints")
+    args = parser.parse_args()
+
+    targets = [
+        ("wsgi_sync", args.wsgi, 1),
+        ("asgi_sync", args.asgi, 1),
+        ("asgi_async", args.asgi, 2),
+    ]
+    report = {"concurrency": args.concurrency, "results": {}}
+    for name, *paths in ENDPOINTS:
+        if args.only and name not in args.only:
+            continue
+        report["results"][name] = {
+            target: run(base.rstrip("/") + paths[path_index - 1], args.token, args.concurrency, args.requests)
+            for target, base, path_index in targets
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
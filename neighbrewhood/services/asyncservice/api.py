@@ -0,0 +1,94 @@
+from django.contrib.gis.geos import GEOSGeometry
+from django.contrib.gis.measure import D
+from django.db.models import Q
+from ninja import Router
+from ninja.errors import HttpError
+from ninja.pagination import paginate
+from ninja.responses import codes_4xx
+from typing import List
+
+from brews.models import Brew
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, SwapClaim
+from common.pagination import KeysetPagination
+from common.schemas import DefaultError
+from services.brewservice.schemas import BrewResponseSchema
+from services.common.auth import AsyncBrewerJWTAuth, AsyncStatelessBrewerJWTAuth
+from services.common.brewers_api import profile_required
+from services.swapservice.schemas import BrewSwapResponseSchema, NearbyOrder, SwapClaimResponseSchema
+
+
+# Async twins of the read-heavy list endpoints, for ASGI deployments. Responses match the
+# sync routes. Serialization runs on the event loop, so every queryset here must load all
+# the schema reads up front (for_listing); a lazy relation would raise SynchronousOnlyOperation.
+async_router = Router(tags=["Async"])
+
+
+@async_router.get(
+    "swaps/",
+    auth=AsyncStatelessBrewerJWTAuth(),
+    response={200: List[BrewSwapResponseSchema], codes_4xx: DefaultError},
+    url_name="async_swaps",
+)
+@profile_required
+@paginate(KeysetPagination)
+async def swaps(request):
+    return BrewSwap.objects.for_listing()
+
+@async_router.get(
+    "swaps/mySwaps",
+    auth=AsyncBrewerJWTAuth(),
+    response={200: List[BrewSwapResponseSchema], codes_4xx: DefaultError},
+    url_name="async_my_swaps",
+)
+@profile_required
+@paginate(KeysetPagination)
+async def my_swaps(request):
+    return BrewSwap.objects.filter(creator=request.user).for_listing()
+
+@async_router.get(
+    "swaps/nearbySwaps",
+    auth=AsyncBrewerJWTAuth(),
+    response={200: List[BrewSwapResponseSchema], codes_4xx: DefaultError},
+    url_name="async_nearby_swaps",
+)
+@profile_required
+@paginate(KeysetPagination, ordering=("distance", "id"), orderings={NearbyOrder.RANK: ("-rank", "id")})
+async def nearby_swaps(request, location: str = None, within: int = None, order: NearbyOrder = NearbyOrder.DISTANCE):
+    if location:
+        try:
+            location = GEOSGeometry(location)
+        except:
+            raise HttpError(400, f'Location {location} improperly formatted. Use SRID')
+    else:
+        location = request.brewer.location
+    
+    if not within:
+        within = 20 # Default to within 20 miles
+
+    query = BrewSwap.objects.filter(~Q(creator=request.user), status=BrewSwapStatusChoices.LIVE)
+    if order == NearbyOrder.RANK:
+        query = query.ranked_nearby(location, D(mi=within))
+    else:
+        query = query.nearby(location, D(mi=within))
+    return query.for_listing()
+
+@async_router.get(
+    "claims/user/myClaims",
+    auth=AsyncBrewerJWTAuth(),
+    response={200: List[SwapClaimResponseSchema], codes_4xx: DefaultError},
+    url_name="async_my_claims",
+)
+@profile_required
+@paginate(KeysetPagination)
+async def my_claims(request):
+    return SwapClaim.objects.filter(creator=request.user).for_listing()
+
+@async_router.get(
+    "brews/",
+    auth=AsyncBrewerJWTAuth(),
+    response={200: List[BrewResponseSchema], codes_4xx: DefaultError},
+    url_name="async_brews",
+)
+@paginate(KeysetPagination)
+async def brews(request):
+    return Brew.objects.for_listing()
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse_lazy
+from requests.status_codes import codes
+
+from brews.models import Brew
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, SwapClaim
+from services.testing.ServiceTestBase import ServiceTestBase
+
+
+class AsyncServiceTestCase(ServiceTestBase):
+    def setUp(self):
+        super().setUp()
+        self.brew_types = self.create_brew_types(["IPA"])
+        self.qualities = self.create_qualities(["Hoppy", "Dark"])
+
+        self.register_user()
+        self.obtain_access_token()
+        self.post(reverse_lazy("api-1.0.0:users_create_brewer"), self.brewer_details)
+        self.obtain_access_token()  # Now with the brewer claims
+
+    def create_brew(self, user):
+        brew = Brew.objects.create(creator=user, brew_type=self.brew_types[0])
+        brew.qualities.set(self.qualities)
+        return brew
+
+    def test_async_lists_match_sync(self):
+        me = get_user_model().objects.get(username=self.username)
+        swap = BrewSwap.objects.create(creator=self.user, brew=self.create_brew(self.user), total_bottles=12)
+        SwapClaim.objects.create(creator=me, brew=self.create_brew(me), swap=swap, num_bottles=2)
+
+        for sync_name, async_name in (
+            ("brewswaps_swaps", "async_swaps"),
+            ("claims_my_claims", "async_my_claims"),
+            ("brew_brews", "async_brews"),
+        ):
+            sync_r = self.get(reverse_lazy(f"api-1.0.0:{sync_name}"))
+            async_r = self.get(reverse_lazy(f"api-1.0.0:{async_name}"))
+            self.assertEqual(async_r.status_code, codes.ok, async_name)
+            self.assertTrue(async_r.json()["items"], async_name)
+            self.assertEqual(async_r.json(), sync_r.json(), async_name)
+
+    def test_async_nearby_matches_sync(self):
+        self.create_brewer()
+        for total_bottles in (2, 24):
+            BrewSwap.objects.create(
+                creator=self.user, brew=self.create_brew(self.user), total_bottles=total_bottles,
+                status=BrewSwapStatusChoices.LIVE,
+            )
+
+        for query in ("", "?order=rank", "?order=rank&limit=1"):
+            sync_r = self.get(f"{reverse_lazy('api-1.0.0:brewswaps_nearby_swaps')}{query}")
+            async_r = self.get(f"{reverse_lazy('api-1.0.0:async_nearby_swaps')}{query}")
+            self.assertEqual(async_r.status_code, codes.ok, query)
+            self.assertTrue(async_r.json()["items"], query)
+            self.assertEqual(async_r.json(), sync_r.json(), query)
+        self.assertEqual(async_r.json()["items"][0]["total_bottles"], 24)
@@ -1,80 +1,137 @@
-from ninja import Router
+from django.http import HttpResponse
+from ninja import Query, Router
 from ninja.responses import codes_4xx
 from ninja.pagination import paginate
-from ninja_jwt.authentication import JWTAuth
 from typing import List
 
-from brews.models import Brew, BrewType, Quality
+from brews import lookups
+from brews.models import Brew
+from common.pagination import KeysetPagination
 from common.schemas import DefaultError
+from services.common.auth import BrewerJWTAuth, StatelessBrewerJWTAuth
 from services.common.brewers_api import profile_required
-from .schemas import BrewCreateSchema, BrewResponseSchema, BrewTypeSchema, QualitySchema
+from services.common.conditional import conditional, object_validators
+from .schemas import (
+    BrewBulkCreateSchema,
+    BrewBulkResponseSchema,
+    BrewCreateSchema,
+    BrewFacetsSchema,
+    BrewResponseSchema,
+    BrewSearchSchema,
+    BrewTypeSchema,
+    QualitySchema,
+)
 
 
 brew_router = Router(tags=["Brewers", "Brews"])
 
 @brew_router.get(
     "brewtypes", 
-    auth=JWTAuth(), 
+    auth=StatelessBrewerJWTAuth(), 
     response=List[BrewTypeSchema],
     url_name="brew_brew_types",
 )
+@conditional(etag=lambda request, **kwargs: lookups.brew_types.etag)
 @paginate
-def brew_types(request):
-    return BrewType.objects.all()
+def brew_types(request, response: HttpResponse):
+    return lookups.brew_types.all()
 
 @brew_router.get(
     "qualities", 
-    auth=JWTAuth(), 
+    auth=StatelessBrewerJWTAuth(), 
     response=List[QualitySchema],
     url_name="brew_qualities",
 )
+@conditional(etag=lambda request, **kwargs: lookups.qualities.etag)
 @paginate
-def qualities(request):
-    return Quality.objects.all()
+def qualities(request, response: HttpResponse):
+    return lookups.qualities.all()
 
 @brew_router.get(
     "", 
-    auth=JWTAuth(), 
+    auth=BrewerJWTAuth(), 
     response=List[BrewResponseSchema],
     url_name="brew_brews",
 )
-@paginate
+@paginate(KeysetPagination)
 def brews(request):
-    return Brew.objects.all()
+    return Brew.objects.for_listing()
 
 @brew_router.get(
     "myBrews", 
-    auth=JWTAuth(), 
+    auth=BrewerJWTAuth(), 
     response=List[BrewResponseSchema],
     url_name="brew_my_brews",
 )
 @profile_required
-@paginate
+@paginate(KeysetPagination)
 def my_brews(request):
-    return request.user.brew_creator.all()
+    return request.user.brew_creator.for_listing()
+
+def search_brews(filters):
+    return Brew.objects.search(
+        text=filters.q,
+        brew_type=filters.brew_type,
+        qualities=filters.qualities,
+        start_date=(filters.started_after, filters.started_before),
+        completion_date=(filters.completed_after, filters.completed_before),
+    )
+
+@brew_router.get(
+    "search",
+    auth=BrewerJWTAuth(),
+    response=List[BrewResponseSchema],
+    url_name="brew_search",
+)
+@paginate(KeysetPagination, ordering=("-rank", "-id"))
+def search(request, filters: Query[BrewSearchSchema]):
+    return search_brews(filters).for_listing()
 
 @brew_router.get(
-    "brews/{id}", 
-    auth=JWTAuth(), 
+    "search/facets",
+    auth=BrewerJWTAuth(),
+    response=BrewFacetsSchema,
+    url_name="brew_search_facets",
+)
+def search_facets(request, filters: Query[BrewSearchSchema]):
+    return search_brews(filters).facets()
+
+@brew_router.get(
+    "brews/{brew_id}", 
+    auth=BrewerJWTAuth(), 
     response={200: BrewResponseSchema, codes_4xx: DefaultError},
     url_name="brew_brew_detail",
 )
-def brew(request, id_):
+@conditional(
+    validators=object_validators(
+        "brew", Brew.objects, "brew_id",
+        timestamps=("updated", "brew_type__updated", "qualities__updated"),
+        counts=("qualities",),
+        values=("creator__username", "creator__email", "creator__first_name"),
+        per_user=False,
+    ),
+    cache_schema=BrewResponseSchema,
+)
+def brew(request, brew_id: int, response: HttpResponse):
     try:
-        return Brew.objects.get(id=id_)
+        return Brew.objects.select_related("brew_type", "creator").prefetch_related("qualities").get(id=brew_id)
     except Brew.DoesNotExist:
-        return 404, {'detail': f'Brew with id {id_} does not exist'}
+        return 404, {'detail': f'Brew with id {brew_id} does not exist'}
 
 @brew_router.post(
     "createBrew", 
-    auth=JWTAuth(), 
+    auth=BrewerJWTAuth(), 
     response={201: BrewResponseSchema, codes_4xx: DefaultError},
     url_name="brew_create_brew",
 )
 @profile_required
 def create_brew(request, brew: BrewCreateSchema):
-    brew_type = BrewType.objects.get(id=brew.brew_type)
-    qualities = Quality.objects.filter(id__in=brew.qualities)
+    brew_type = lookups.brew_types.get(brew.brew_type)
+    if brew_type is None:
+        return 400, {'detail': f'Brew type with id {brew.brew_type} does not exist'}
+    qualities, missing = lookups.qualities.in_bulk(brew.qualities)
+    if missing:
+        return 400, {'detail': f'Qualities with ids {missing} do not exist'}
     brew = Brew.objects.create(
         brew_type=brew_type,
         start_date=brew.start_date,
@@ -83,5 +140,26 @@ def create_brew(request, brew: BrewCreateSchema):
         creator=request.user,
     )
     brew.qualities.set(qualities)
-    brew.save()
     return 201, brew
+
+@brew_router.post(
+    "bulk", 
+    auth=BrewerJWTAuth(), 
+    response={201: BrewBulkResponseSchema, codes_4xx: DefaultError, 400: BrewBulkResponseSchema},
+    url_name="brew_bulk_create_brews",
+)
+@profile_required
+def bulk_create_brews(request, payload: BrewBulkCreateSchema):
+    items = [brew.dict() for brew in payload.brews]
+    brews, errors = Brew.objects.bulk_create_brews(request.user, items, atomic=payload.atomic)
+    results = [
+        {
+            "index": i,
+            "id": brew.id if brew is not None else None,
+            "detail": errors.get(i),
+        }
+        for i, brew in enumerate(brews)
+    ]
+    created = sum(1 for brew in brews if brew is not None)
+    status = 400 if payload.atomic and errors else 201
+    return status, {"created": created, "results": results}
@@ -1,5 +1,6 @@
-from typing import List
-from ninja import ModelSchema
+from datetime import date
+from typing import List, Optional
+from ninja import Field, ModelSchema, Schema
 
 from brews.models import Brew, BrewType, Quality
 from services.users.schemas import UserLimitedSchema
@@ -38,6 +39,22 @@ class BrewCreateSchema(ModelSchema):
         ]
 
 
+class BrewBulkCreateSchema(Schema):
+    brews: List[BrewCreateSchema] = Field(..., min_length=1, max_length=Brew.MAX_BULK_CREATE)
+    atomic: bool = True
+
+
+class BrewBulkResultSchema(Schema):
+    index: int
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BrewBulkResponseSchema(Schema):
+    created: int
+    results: List[BrewBulkResultSchema]
+
+
 class BrewResponseSchema(ModelSchema):
     qualities: List[QualitySchema]
     brew_type: BrewTypeSchema
@@ -51,3 +68,24 @@ class BrewResponseSchema(ModelSchema):
             "notes",
             "id",
         ]
+
+
+class BrewSearchSchema(Schema):
+    q: Optional[str] = Field(None, description="Words to find in the brew type, qualities and notes")
+    brew_type: Optional[int] = None
+    qualities: List[int] = Field([], description="Brews must have all of these")
+    started_after: Optional[date] = None
+    started_before: Optional[date] = None
+    completed_after: Optional[date] = None
+    completed_before: Optional[date] = None
+
+
+class FacetSchema(Schema):
+    id: int
+    value: str
+    count: int
+
+
+class BrewFacetsSchema(Schema):
+    brew_type: List[FacetSchema]
+    qualities: List[FacetSchema]
@@ -1,6 +1,8 @@
 from datetime import date
 from django.urls import reverse_lazy
 from requests.status_codes import codes
+
+from brews.models import Brew, BrewType
 from services.testing.ServiceTestBase import ServiceTestBase
 
 
@@ -48,3 +50,112 @@ class BrewServiceTestCase(ServiceTestBase):
         r = self.get(my_brews_url)
         self.assertEqual(r.status_code, codes.ok)
         self.assertGreater(len(r.json()['items']), 0)
+
+    def test_brew_types_etag(self):
+        self.register_user()
+        self.obtain_access_token()
+        bt_url = reverse_lazy("api-1.0.0:brew_brew_types")
+
+        r = self.get(bt_url)
+        self.assertEqual(r.status_code, codes.ok)
+        etag = r["ETag"]
+
+        with self.assertNumQueries(0):
+            r = self.get(bt_url, {"If-None-Match": etag})
+        self.assertEqual(r.status_code, codes.not_modified)
+        self.assertEqual(r["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BrewType.objects.create(value="Stout", creator=self.user)
+        r = self.get(bt_url, {"If-None-Match": etag})
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertNotEqual(r["ETag"], etag)
+        self.assertIn("Stout", [bt["value"] for bt in r.json()["items"]])
+
+    def test_bulk_create_brews(self):
+        self.register_user()
+        self.obtain_access_token()
+        self.post(reverse_lazy("api-1.0.0:users_create_brewer"), self.brewer_details)
+        bulk_url = reverse_lazy("api-1.0.0:brew_bulk_create_brews")
+
+        qts = [q.id for q in self.qualities]
+        brews = [
+            {"brew_type": self.brew_types[0].id, "qualities": qts, "notes": "first"},
+            {"brew_type": 0, "qualities": qts},
+            {"brew_type": self.brew_types[1].id, "qualities": qts[:1], "notes": "third"},
+        ]
+
+        r = self.post(bulk_url, {"brews": brews})
+        self.assertEqual(r.status_code, codes.bad_request)
+        self.assertEqual(r.json()["created"], 0)
+        self.assertIsNotNone(r.json()["results"][1]["detail"])
+        self.assertFalse(Brew.objects.exists())
+
+        r = self.post(bulk_url, {"brews": brews, "atomic": False})
+        self.assertEqual(r.status_code, codes.created)
+        results = r.json()["results"]
+        self.assertEqual(r.json()["created"], 2)
+        self.assertIsNone(results[1]["id"])
+
+        first = Brew.objects.get(id=results[0]["id"])
+        self.assertEqual(first.notes, "first")
+        self.assertEqual(sorted(q.id for q in first.qualities.all()), sorted(qts))
+        self.assertEqual(Brew.objects.get(id=results[2]["id"]).qualities.count(), 1)
+
+    def test_search(self):
+        self.register_user()
+        self.obtain_access_token()
+        hoppy, dark = self.qualities
+        ipa, lager = self.brew_types
+        citrus = Brew.objects.create(
+            creator=self.user, brew_type=ipa, notes="A citrus bomb", start_date=date(2024, 1, 10),
+        )
+        citrus.qualities.set([hoppy, dark])
+        crisp = Brew.objects.create(
+            creator=self.user, brew_type=lager, notes="Crisp and clean", start_date=date(2024, 3, 1),
+        )
+        crisp.qualities.set([dark])
+
+        search_url = reverse_lazy("api-1.0.0:brew_search")
+
+        def search_ids(query):
+            r = self.get(f"{search_url}?{query}")
+            self.assertEqual(r.status_code, codes.ok)
+            return {item["id"] for item in r.json()["items"]}
+
+        self.assertEqual(search_ids("q=citrus"), {citrus.id})
+        self.assertEqual(search_ids("q=dark"), {citrus.id, crisp.id})
+        self.assertEqual(search_ids("q=lager"), {crisp.id})
+        self.assertEqual(search_ids(f"qualities={hoppy.id}&qualities={dark.id}"), {citrus.id})
+        self.assertEqual(search_ids("started_after=2024-02-01"), {crisp.id})
+
+        hoppy.value = "Resinous"
+        hoppy.save()
+        self.assertEqual(search_ids("q=resinous"), {citrus.id})
+
+        r = self.get(f"{reverse_lazy('api-1.0.0:brew_search_facets')}?q=dark")
+        self.assertEqual(r.status_code, codes.ok)
+        facets = r.json()
+        self.assertEqual({f["id"]: f["count"] for f in facets["brew_type"]}, {ipa.id: 1, lager.id: 1})
+        self.assertEqual({f["id"]: f["count"] for f in facets["qualities"]}, {dark.id: 2, hoppy.id: 1})
+
+    def test_search_pages(self):
+        self.register_user()
+        self.obtain_access_token()
+        notes = ["hops", "hops hops", "hops and malt", "citrus hops", "hops hops hops"]
+        ids = {
+            Brew.objects.create(creator=self.user, brew_type=self.brew_types[0], notes=note).id
+            for note in notes * 2
+        }
+
+        search_url = reverse_lazy("api-1.0.0:brew_search")
+        seen = []
+        r = self.get(f"{search_url}?q=hops&limit=3")
+        while True:
+            self.assertEqual(r.status_code, codes.ok)
+            seen.extend(item["id"] for item in r.json()["items"])
+            if not r.json()["next"]:
+                break
+            r = self.get(f"{search_url}?q=hops&limit=3&cursor={r.json()['next']}")
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), ids)
@@ -1,14 +1,15 @@
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
 from ninja import Router
 from ninja.pagination import paginate
 from ninja.responses import codes_4xx
-from ninja_jwt.authentication import JWTAuth
 from typing import List
-from brewswaps.models import (
-    ClaimStatusChoices,
-    SwapClaim,
-)
+from brewswaps.models import SwapClaim
+from common.pagination import KeysetPagination
 from common.schemas import DefaultError, DefaultSuccess
+from services.common.auth import BrewerJWTAuth
 from services.common.brewers_api import profile_required
+from services.common.conditional import conditional, object_validators
 from services.swapservice.schemas import SwapClaimResponseSchema
 
 
@@ -17,33 +18,31 @@ claims_router = Router(tags=["Brewers", "Claims"])
 # TODO: move these into a separate router
 @claims_router.get(
     "{claim_id}/accept",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: DefaultSuccess, codes_4xx: DefaultError},
     url_name="claims_accept_claim",
 )
 @profile_required
 def accept_claim(request, claim_id):
     try:
-        claim = SwapClaim.objects.get(id=claim_id)
+        claim = SwapClaim.objects.select_related("swap").get(id=claim_id)
     except SwapClaim.DoesNotExist:
         return 404, {"detail": f"Claim {claim_id} does not exist"}
     if request.user != claim.swap.creator:
         return 403, {"detail": "You can't accept a claim for a swap you didn't create"}
-    if claim.swap.bottles_available == 0:
-        return 400, {"details": "Can't accept, no bottles remaining"}
     if request.user == claim.creator:
         return 403, {"detail": "You can't accept your own claim"}
-    if claim.status == ClaimStatusChoices.CANCELED:
-        return 400, {"detail": "This claim has already been canceled by the creator"}
-    if claim.swap.bottles_available < claim.num_bottles:
-        return 400, {"detail": "Not enough bottles available"}
 
-    msg = claim.accept()
+    # Status and capacity are checked under lock by accept()
+    try:
+        msg = claim.accept()
+    except ValidationError as e:
+        return 400, {"detail": e.message}
     return 200, {"message": msg}
 
 @claims_router.get(
     "{claim_id}/cancel",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: DefaultSuccess, codes_4xx: DefaultError},
     url_name="claims_cancel_claim",
 )
@@ -61,14 +60,32 @@ def cancel_claim(request, claim_id):
 
 @claims_router.get(
     "{claim_id}",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: SwapClaimResponseSchema, codes_4xx: DefaultError},
     url_name="claims_claim_detail",
 )
 @profile_required
-def cancel_claim(request, claim_id):
+@conditional(
+    validators=object_validators(
+        "claim", SwapClaim.objects, "claim_id",
+        timestamps=(
+            "updated", "brew__updated", "brew__brew_type__updated", "brew__qualities__updated",
+            "swap__updated", "swap__brew__updated", "swap__brew__brew_type__updated", "swap__brew__qualities__updated",
+            "swap__claims__updated", "swap__brew__score__updated", "swap__creator__brewer__score__updated",
+        ),
+        counts=("swap__claims", "brew__qualities", "swap__brew__qualities"),
+        values=(
+            "creator__username", "creator__email", "creator__first_name",
+            "brew__creator__username", "brew__creator__email", "brew__creator__first_name",
+            "swap__creator__username", "swap__creator__email", "swap__creator__first_name",
+            "swap__brew__creator__username", "swap__brew__creator__email", "swap__brew__creator__first_name",
+        ),
+    ),
+    cache_schema=SwapClaimResponseSchema,
+)
+def claim_detail(request, claim_id: int, response: HttpResponse):
     try:
-        claim = SwapClaim.objects.get(id=claim_id)
+        claim = SwapClaim.objects.for_listing().get(id=claim_id)  # The swap with its claim summary and scores
     except SwapClaim.DoesNotExist:
         return 404, {"detail": f"Claim {claim_id} does not exist"}
 
@@ -76,12 +93,12 @@ def cancel_claim(request, claim_id):
 
 @claims_router.get(
     "user/myClaims",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response=List[SwapClaimResponseSchema],
     url_name="claims_my_claims",
 )
 @profile_required
-@paginate
+@paginate(KeysetPagination)
 def my_claims(request):
-    claims = SwapClaim.objects.filter(creator=request.user)
+    claims = SwapClaim.objects.filter(creator=request.user).for_listing()
     return claims
@@ -1,3 +1,61 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TransactionTestCase
 
-# Create your tests here.
+from brews.models import Brew, BrewType
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, ClaimStatusChoices, SwapClaim
+
+
+class AcceptClaimConcurrencyTestCase(TransactionTestCase):
+    """Accepts run on separate threads and connections, so this needs a real DB and real commits."""
+    TOTAL_BOTTLES = 15
+    BOTTLES_PER_CLAIM = 2
+    NUM_CLAIMS = 20
+    WORKERS = 8
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create(username="owner")
+        self.claimer = User.objects.create(username="claimer")
+        self.brew_type = BrewType.objects.create(value="IPA")
+        self.swap = BrewSwap.objects.create(
+            creator=self.owner,
+            brew=self.create_brew(self.owner),
+            total_bottles=self.TOTAL_BOTTLES,
+            status=BrewSwapStatusChoices.LIVE,
+        )
+        self.claim_ids = [
+            SwapClaim.objects.create(
+                creator=self.claimer,
+                brew=self.create_brew(self.claimer),
+                swap=self.swap,
+                num_bottles=self.BOTTLES_PER_CLAIM,
+            ).id
+            for _ in range(self.NUM_CLAIMS)
+        ]
+
+    def create_brew(self, user):
+        return Brew.objects.create(creator=user, brew_type=self.brew_type)
+
+    @staticmethod
+    def accept(claim_id):
+        try:
+            return SwapClaim.objects.get(id=claim_id).accept()
+        except ValidationError as e:
+            return e.message
+        finally:
+            connection.close()
+
+    def test_concurrent_accepts_do_not_over_allocate(self):
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(self.accept, self.claim_ids))
+
+        expected = self.TOTAL_BOTTLES // self.BOTTLES_PER_CLAIM
+        self.assertEqual(results.count("Claim accepted"), expected)
+        self.assertEqual(SwapClaim.objects.filter(status=ClaimStatusChoices.ACCEPTED).count(), expected)
+
+        self.swap.refresh_from_db()
+        self.assertEqual(self.swap.accepted_bottles, expected * self.BOTTLES_PER_CLAIM)
+        self.assertLessEqual(self.swap.accepted_bottles, self.swap.total_bottles)
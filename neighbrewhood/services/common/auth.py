@@ -0,0 +1,185 @@
+import copy
+import time
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from ninja.security import AsyncHttpBearer
+from ninja_jwt.authentication import JWTAuth, JWTStatelessUserAuthentication
+from ninja_jwt.exceptions import AuthenticationFailed, InvalidToken
+from ninja_jwt.models import TokenUser
+from ninja_jwt.schema import TokenObtainPairInputSchema
+from ninja_jwt.settings import api_settings
+from ninja_jwt.tokens import RefreshToken
+
+from brewers.models import Brewer
+
+
+User = get_user_model()
+
+
+class ProfileCache:
+    """
+    Process-local cache of users loaded together with their brewer profile, keyed by user id.
+
+    Entries live for ``settings.BREWER_PROFILE_CACHE_TTL`` seconds (0 turns the cache off)
+    and are dropped whenever the user or their Brewer is saved or deleted. Callers get a deep
+    copy, including the cached Brewer, so requests never share a model instance.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, "BREWER_PROFILE_CACHE_TTL", 0)
+
+    def get(self, user_id):
+        if not self.ttl:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, user = entry
+        if expires < time.monotonic():
+            self.invalidate(user_id)
+            return None
+        return copy.deepcopy(user)
+
+    def set(self, user_id, user):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.deepcopy(user))
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+profile_cache = ProfileCache()
+
+
+@receiver(post_save, sender=Brewer)
+@receiver(post_delete, sender=Brewer)
+def invalidate_brewer_profile(sender, instance, **kwargs):
+    profile_cache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_profile(sender, instance, **kwargs):
+    profile_cache.invalidate(instance.pk)
+
+
+class BrewerJWTAuth(JWTAuth):
+    """
+    JWTAuth that loads the user and their brewer profile in one joined query, and sets
+    ``request.brewer`` (None when the user has no profile yet) for profile_required.
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = profile_cache.get(user_id)
+        if user is None:
+            try:
+                user = User.objects.select_related("brewer").get(**{api_settings.USER_ID_FIELD: user_id})
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found")
+            profile_cache.set(user_id, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive")
+        return user
+
+    def authenticate(self, request, token):
+        user = super().authenticate(request, token)
+        request.brewer = getattr(user, "brewer", None)
+        return user
+
+
+def brewer_claims(user):
+    """Claims embedded in tokens at issue time so StatelessBrewerJWTAuth needs no lookup."""
+    brewer_id = Brewer.objects.filter(user=user).values_list("id", flat=True).first()
+    return {
+        "username": user.get_username(),
+        "has_brewer": brewer_id is not None,
+        "brewer_id": brewer_id,
+    }
+
+
+class BrewerTokenObtainPairInputSchema(TokenObtainPairInputSchema):
+    """Token pair with brewer_claims() on both tokens (refreshed access tokens inherit them)."""
+    @classmethod
+    def get_token(cls, user):
+        refresh = RefreshToken.for_user(user)
+        for claim, value in brewer_claims(user).items():
+            refresh[claim] = value
+        return {
+            "refresh": str(refresh),
+            "access": str(refresh.access_token),
+        }
+
+
+class BrewerTokenUser(TokenUser):
+    """
+    Stateless user backed by the token's claims. ``has_brewer`` and ``brewer_id`` come from
+    the token; ``user`` and ``brewer`` load the real rows in one query, only when used.
+    """
+    @cached_property
+    def has_brewer(self):
+        return self.token.get("has_brewer", False)
+
+    @cached_property
+    def brewer_id(self):
+        return self.token.get("brewer_id")
+
+    @cached_property
+    def user(self):
+        try:
+            return User.objects.select_related("brewer").get(pk=self.id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found")  # Deleted since the token was issued
+
+    @property
+    def brewer(self):
+        return self.user.brewer
+
+
+class StatelessBrewerJWTAuth(JWTStatelessUserAuthentication):
+    """
+    Authenticates from the token alone: ``request.user`` is a BrewerTokenUser and no query
+    runs unless the view reaches for the full user. Opt in per route on endpoints that only
+    need the caller's id; filter on ``request.user.id`` rather than the user object.
+
+    Nothing here checks ``is_active``: a deactivated or deleted account keeps access to these
+    routes until its access token expires, so keep them to reads the caller could already see.
+    """
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return BrewerTokenUser(validated_token)
+
+
+class AsyncBrewerJWTAuth(BrewerJWTAuth, AsyncHttpBearer):
+    """BrewerJWTAuth for async views. The user and brewer are loaded in a worker thread."""
+    async def authenticate(self, request, token):
+        return await sync_to_async(BrewerJWTAuth.authenticate)(self, request, token)
+
+
+class AsyncStatelessBrewerJWTAuth(StatelessBrewerJWTAuth, AsyncHttpBearer):
+    """StatelessBrewerJWTAuth for async views. Nothing to await: the token is all it reads."""
+    async def authenticate(self, request, token):
+        return StatelessBrewerJWTAuth.authenticate(self, request, token)
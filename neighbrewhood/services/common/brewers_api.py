@@ -1,14 +1,49 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.functional import SimpleLazyObject
 from functools import wraps
 
 
+def get_brewer(request):
+    """The requesting user's Brewer, or None. Uses ``request.brewer`` when auth already loaded it."""
+    if hasattr(request, "brewer"):
+        return request.brewer
+    try:
+        return request.user.brewer
+    except AttributeError:
+        return None
+
+
 def profile_required(f):
+    if iscoroutinefunction(f):
+        return async_profile_required(f)
+
     @wraps(f)
     def check_for_profile(request, *args, **kwargs):
         def no_profile_resp(request, *args, **kwargs):
             return 404, {"detail": "You must create a profile"}
-        try:
-            request.user.brewer
-        except AttributeError:
+        if getattr(request.user, "has_brewer", False):
+            # Stateless token user whose claims say they have a profile; only load it if used
+            request.brewer = SimpleLazyObject(lambda: request.user.brewer)
+            return f(request, *args, **kwargs)
+        brewer = get_brewer(request)
+        if brewer is None:
             return no_profile_resp(request, *args, **kwargs)
+        request.brewer = brewer
         return f(request, *args, **kwargs)
-    return check_for_profile
\ No newline at end of file
+    return check_for_profile
+
+
+def async_profile_required(f):
+    """profile_required for async views; the brewer lookup, if any, runs in a worker thread."""
+    @wraps(f)
+    async def check_for_profile(request, *args, **kwargs):
+        if getattr(request.user, "has_brewer", False):
+            # Only a lazy handle: async views must load it with sync_to_async if they need it
+            request.brewer = SimpleLazyObject(lambda: request.user.brewer)
+            return await f(request, *args, **kwargs)
+        brewer = await sync_to_async(get_brewer)(request)
+        if brewer is None:
+            return 404, {"detail": "You must create a profile"}
+        request.brewer = brewer
+        return await f(request, *args, **kwargs)
+    return check_for_profile
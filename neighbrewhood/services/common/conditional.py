@@ -0,0 +1,153 @@
+import hashlib
+import json
+from calendar import timegm
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, F, Max
+from django.db.models.functions import Greatest
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+from ninja.responses import NinjaJSONEncoder
+
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def object_version(queryset, pk, timestamps=("updated",), counts=(), values=()):
+    """
+    ``(last_modified, counts, values)`` for row ``pk`` of ``queryset`` from a single query, or
+    None if it doesn't exist. ``timestamps`` may reach across relations; to-many ones are
+    folded in with Max. ``counts`` are related rows counted so deletions change the version
+    too. ``values`` are columns of related rows that have no timestamp of their own, such as
+    a creator's username.
+    """
+    model = queryset.model
+    expressions = []
+    for path in timestamps:
+        to_many = any(f.many_to_many or f.one_to_many for f in _path_fields(model, path))
+        expressions.append(Max(path) if to_many else F(path))
+    modified = Greatest(*expressions) if len(expressions) > 1 else expressions[0]
+    annotations = {"_modified": modified}
+    annotations.update({f"_count{i}": Count(path, distinct=True) for i, path in enumerate(counts)})
+    annotations.update({f"_value{i}": F(path) for i, path in enumerate(values)})
+    row = queryset.filter(pk=pk).annotate(**annotations).values_list(*annotations).first()
+    if row is None or row[0] is None:
+        return None
+    return row[0], row[1:1 + len(counts)], row[1 + len(counts):]
+
+
+def _path_fields(model, path):
+    fields = []
+    for name in path.split("__")[:-1]:
+        field = model._meta.get_field(name)
+        fields.append(field)
+        model = field.related_model
+    return fields
+
+
+def object_validators(
+    prefix, queryset, pk_arg, timestamps=("updated",), counts=(), values=(), per_user=True, query_params=(),
+):
+    """
+    A ``validators`` callable for ``conditional``: the ETag combines the row's version with
+    the viewer (the schemas resolve per-user actions) and any ``query_params`` that change
+    the body. Last-Modified is the newest of ``timestamps``. ``values`` only go into the
+    ETag as a digest, so it never carries the columns themselves.
+
+    Together these must cover everything the response schema reads, or a cached body can
+    outlive a change to it.
+    """
+    def validators(request, **kwargs):
+        pk = kwargs[pk_arg]
+        version = object_version(queryset, pk, timestamps, counts, values)
+        if version is None:
+            return None, None
+        modified, related_counts, related_values = version
+        parts = [prefix, str(pk), str(modified.timestamp())]
+        parts.extend(str(count) for count in related_counts)
+        if related_values:
+            parts.append(hashlib.md5(repr(related_values).encode(), usedforsecurity=False).hexdigest()[:16])
+        if per_user:
+            parts.append(f"u{request.user.pk}")
+        parts.extend(f"{param}={request.GET.get(param, '')}" for param in query_params)
+        return "-".join(parts), modified
+    return validators
+
+
+def _response_cache():
+    alias = getattr(settings, "RESPONSE_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def conditional(etag=None, last_modified=None, validators=None, cache_schema=None):
+    """
+    Ninja counterpart to django.views.decorators.http.condition. ``etag`` and
+    ``last_modified`` are callables taking the view's arguments, or ``validators`` one
+    returning both. When the request's If-None-Match / If-Modified-Since still match, a 304
+    is returned before the view runs, so nothing is queried or serialized.
+
+    With ``cache_schema`` and ``settings.RESPONSE_CACHE_ALIAS`` set, 200 bodies are cached
+    under their ETag. An entry is only as fresh as the validators: whatever the body reads
+    must change the ETag when it changes, and writes that skip save() (queryset updates)
+    don't touch ``updated`` timestamps.
+
+    Place it below the router decorator. The view must take ``response: HttpResponse`` so
+    the validators can be set on normal responses too.
+    """
+    def decorator(f):
+        @wraps(f)
+        def check_conditions(request, *args, **kwargs):
+            if validators:
+                etag_value, modified = validators(request, *args, **kwargs)
+            else:
+                etag_value = etag(request, *args, **kwargs) if etag else None
+                modified = last_modified(request, *args, **kwargs) if last_modified else None
+
+            headers = HttpResponse()
+            if etag_value is not None:
+                etag_value = quote_etag(etag_value)
+                headers["ETag"] = etag_value
+            modified_ts = None
+            if modified is not None:
+                modified_ts = timegm(modified.utctimetuple())
+                headers["Last-Modified"] = http_date(modified_ts)
+            if validators:
+                patch_vary_headers(headers, ["Authorization"])
+
+            conditional_response = get_conditional_response(
+                request, etag=etag_value, last_modified=modified_ts, response=headers
+            )
+            if conditional_response is not headers:
+                return conditional_response
+
+            cache = _response_cache() if cache_schema and etag_value else None
+            if cache is not None:
+                body = cache.get(f"response:{etag_value}")
+                if body is not None:
+                    return _with_headers(HttpResponse(body, content_type=JSON_CONTENT_TYPE), headers)
+
+            response = kwargs.get("response")
+            if response is not None:
+                _with_headers(response, headers)
+            result = f(request, *args, **kwargs)
+
+            if cache is not None:
+                status, obj = result if isinstance(result, tuple) else (200, result)
+                if status == 200:
+                    data = cache_schema.from_orm(obj, context={"request": request, "response_status": 200}).model_dump()
+                    body = json.dumps(data, cls=NinjaJSONEncoder)
+                    cache.set(f"response:{etag_value}", body, settings.RESPONSE_CACHE_TIMEOUT)
+                    return _with_headers(HttpResponse(body, content_type=JSON_CONTENT_TYPE), headers)
+            return result
+        return check_conditions
+    return decorator
+
+
+def _with_headers(response, headers):
+    for header in ("ETag", "Last-Modified", "Vary"):
+        if header in headers:
+            response[header] = headers[header]
+    return response
@@ -0,0 +1,33 @@
+from django.http import HttpResponse
+from ninja import Router
+from ninja.responses import codes_4xx
+
+from common.schemas import DefaultError, schema_documents
+from services.common.conditional import conditional
+
+
+SCHEMA_MAX_AGE = 60 * 60 * 24 * 365  # Ref URLs carry the document version, so they never go stale
+
+
+schemas_router = Router(tags=["Schemas"])
+
+
+def schema_etag(request, name, **kwargs):
+    schema_cls = schema_documents.get(name)
+    return schema_documents.version(schema_cls) if schema_cls else None
+
+
+@schemas_router.get(
+    "{name}",
+    response={200: dict, codes_4xx: DefaultError},
+    url_name="schemas_document",
+)
+@conditional(etag=schema_etag)
+def schema_document(request, name: str, response: HttpResponse):
+    schema_cls = schema_documents.get(name)
+    if schema_cls is None:
+        return 404, {"detail": f"Schema {name} does not exist"}
+    document = HttpResponse(schema_documents.content(schema_cls), content_type="application/json")
+    document["ETag"] = response["ETag"]
+    document["Cache-Control"] = f"public, max-age={SCHEMA_MAX_AGE}, immutable"
+    return document
@@ -0,0 +1,116 @@
+from django.contrib.gis.geos import Polygon
+from django.contrib.gis.measure import D
+from django.core.exceptions import ValidationError
+from django.db.models import F, Value
+from django.db.models.functions import Floor
+from ninja import Query, Router
+from ninja.pagination import paginate
+from ninja.responses import codes_4xx
+from typing import List
+
+from common.pagination import KeysetPagination
+from common.schemas import DefaultError
+from giveaways.models import Claim, Giveaway
+from services.common.auth import BrewerJWTAuth
+from services.common.brewers_api import profile_required
+from .schemas import (
+    GiveawayClaimCreateSchema,
+    GiveawayClaimResponseSchema,
+    GiveawayClustersResponseSchema,
+    GiveawayResponseSchema,
+)
+
+
+giveaway_router = Router(tags=["Brewers", "Giveaways"])
+
+CLUSTER_CELLS_PER_TILE = 8  ## Grid cells across one 256px map tile at the requested zoom
+MAX_CLUSTER_CELLS = 64  ## Per side of the bounding box; larger boxes get coarser cells
+MIN_CLUSTER_CELL_SIZE = 0.001  ## Degrees, about 100 m. Finer cells would give away where a lone giveaway is
+NEARBY_DISTANCE_STEP = 100.0  ## Meters. Nearby results are paged on distance rounded down to this
+
+# Search
+
+@giveaway_router.get(
+    "nearby",
+    auth=BrewerJWTAuth(),
+    response={200: List[GiveawayResponseSchema], codes_4xx: DefaultError},
+    url_name="giveaways_nearby",
+)
+@profile_required
+@paginate(KeysetPagination, ordering=("distance_step", "id"))
+def nearby_giveaways(request, within: int = None):
+    """
+    Open giveaways within ``within`` miles of the caller's profile location, nearest first
+    to NEARBY_DISTANCE_STEP. Giveaway locations are private: searches can't start anywhere
+    else, and neither the items nor the cursors carry an exact distance.
+    """
+    if not within:
+        within = 20 # Default to within 20 miles
+
+    query = Giveaway.objects.open().exclude(brewer=request.brewer)
+    return query.nearby(request.brewer.location, D(mi=within)).annotate(
+        distance_step=Floor(F("distance") / Value(NEARBY_DISTANCE_STEP)),
+    )
+
+
+@giveaway_router.get(
+    "clusters",
+    auth=BrewerJWTAuth(),
+    response={200: GiveawayClustersResponseSchema, codes_4xx: DefaultError},
+    url_name="giveaways_clusters",
+)
+def giveaway_clusters(request, bbox: str, zoom: int = Query(..., ge=0, le=22)):
+    """
+    Open giveaways inside ``bbox`` (min_lon,min_lat,max_lon,max_lat) counted per grid cell,
+    for drawing a map at ``zoom``. Cells shrink as the map zooms in, down to
+    MIN_CLUSTER_CELL_SIZE.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(","))
+    except ValueError:
+        return 400, {"detail": f"Bounding box {bbox} improperly formatted. Use min_lon,min_lat,max_lon,max_lat"}
+    if min_lon >= max_lon or min_lat >= max_lat:
+        return 400, {"detail": "Bounding box must have min_lon < max_lon and min_lat < max_lat"}
+
+    cell_size = max(
+        360 / 2 ** zoom / CLUSTER_CELLS_PER_TILE,
+        max(max_lon - min_lon, max_lat - min_lat) / MAX_CLUSTER_CELLS,
+        MIN_CLUSTER_CELL_SIZE,
+    )
+    area = Polygon.from_bbox((min_lon, min_lat, max_lon, max_lat))
+    area.srid = 4326
+    return {
+        "cell_size": cell_size,
+        "clusters": list(Giveaway.objects.open().clusters(area, cell_size)),
+    }
+
+# Claims
+
+@giveaway_router.post(
+    "{giveaway_id}/claim",
+    auth=BrewerJWTAuth(),
+    response={201: GiveawayClaimResponseSchema, codes_4xx: DefaultError},
+    url_name="giveaways_claim",
+)
+@profile_required
+def claim_giveaway(request, giveaway_id: int, claim: GiveawayClaimCreateSchema):
+    try:
+        giveaway = Giveaway.objects.get(id=giveaway_id)
+    except Giveaway.DoesNotExist:
+        return 404, {"detail": f"Giveaway {giveaway_id} does not exist"}
+    if giveaway.brewer_id == request.brewer.id:
+        return 403, {"detail": "You can't claim your own giveaway"}
+    if giveaway.status != Giveaway.StatusChoices.OPEN:
+        return 400, {"detail": "This giveaway is not open"}
+
+    # Limits are enforced by the conditional update in Claim.save()
+    try:
+        claim_obj = Claim.objects.create(
+            creator=request.user,
+            claimer=request.brewer,
+            giveaway=giveaway,
+            num_bottles=claim.num_bottles,
+        )
+    except ValidationError as e:
+        return 400, {"detail": e.message}
+    return 201, claim_obj
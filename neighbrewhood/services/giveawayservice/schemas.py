@@ -0,0 +1,61 @@
+from ninja import Field, ModelSchema, Schema
+from typing import List
+
+from giveaways.models import Claim, Giveaway
+
+
+class GiveawayResponseSchema(ModelSchema):
+    remaining_bottles: int  ## No distance: with a few searches it would locate the giveaway
+
+    class Meta:
+        model = Giveaway
+        fields = [
+            "id",
+            "brew",
+            "bottles_available",
+            "max_increment",
+            "bottled",
+            "status",
+            "created",
+        ]
+
+
+class GiveawayClusterSchema(Schema):
+    longitude: float
+    latitude: float
+    count: int
+    remaining_bottles: int
+
+    @staticmethod
+    def resolve_longitude(obj):
+        return obj["cell"].x
+
+    @staticmethod
+    def resolve_latitude(obj):
+        return obj["cell"].y
+
+
+class GiveawayClustersResponseSchema(Schema):
+    cell_size: float  ## Degrees
+    clusters: List[GiveawayClusterSchema]
+
+
+class GiveawayClaimCreateSchema(ModelSchema):
+    num_bottles: int = Field(..., ge=1)
+
+    class Meta:
+        model = Claim
+        fields = [
+            "num_bottles",
+        ]
+
+
+class GiveawayClaimResponseSchema(ModelSchema):
+    class Meta:
+        model = Claim
+        fields = [
+            "id",
+            "giveaway",
+            "num_bottles",
+            "created",
+        ]
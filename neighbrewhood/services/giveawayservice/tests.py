@@ -0,0 +1,130 @@
+from django.contrib.gis.geos import Point
+from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
+from requests.status_codes import codes
+
+from brewers.models import Brewer
+from giveaways.models import Claim, Giveaway
+from services.giveawayservice.api import MIN_CLUSTER_CELL_SIZE
+from services.testing.ServiceTestBase import ServiceTestBase
+
+
+class GiveawayServiceTestCase(ServiceTestBase):
+    def setUp(self):
+        super().setUp()
+        owner = self.create_brewer()
+        self.giveaway = Giveaway.objects.create(
+            creator=self.user,
+            brewer=owner,
+            brew=self.create_brew(),
+            bottles_available=10,
+            max_increment=4,
+            location=owner.location,
+            status=Giveaway.StatusChoices.OPEN,
+        )
+
+        self.register_user()
+        self.obtain_access_token()
+        crt_brewer_url = reverse_lazy("api-1.0.0:users_create_brewer")
+        self.post(crt_brewer_url, self.brewer_details)
+
+    def claim(self, num_bottles):
+        claim_url = reverse_lazy("api-1.0.0:giveaways_claim", args=[self.giveaway.id])
+        return self.post(claim_url, {"num_bottles": num_bottles})
+
+    def test_claim(self):
+        r = self.claim(4)
+        self.assertEqual(r.status_code, codes.created)
+        self.assertEqual(r.json()["num_bottles"], 4)
+
+        self.giveaway.refresh_from_db()
+        self.assertEqual(self.giveaway.bottles_claimed, 4)
+        self.assertEqual(self.giveaway.remaining_bottles, 6)
+
+    def test_claim_limits(self):
+        r = self.claim(5)
+        self.assertEqual(r.status_code, codes.bad)
+
+        self.assertEqual(self.claim(4).status_code, codes.created)
+        self.assertEqual(self.claim(4).status_code, codes.created)
+        r = self.claim(4)
+        self.assertEqual(r.status_code, codes.bad)
+        self.assertEqual(r.json()["detail"], "Not nough remaining bottles")
+
+        self.giveaway.refresh_from_db()
+        self.assertEqual(self.giveaway.bottles_claimed, 8)
+
+        # Zero or negative claims would hand bottles back
+        for num_bottles in (0, -4):
+            self.assertEqual(self.claim(num_bottles).status_code, codes.unprocessable_entity)
+        claimer = Brewer.objects.get(user__username=self.user_details["username"])
+        with self.assertRaises(ValidationError):
+            Claim.objects.create(claimer=claimer, giveaway=self.giveaway, num_bottles=-4)
+        self.giveaway.refresh_from_db()
+        self.assertEqual(self.giveaway.bottles_claimed, 8)
+
+    def test_save_keeps_bottles_claimed(self):
+        stale = Giveaway.objects.get(id=self.giveaway.id)
+        self.assertEqual(self.claim(3).status_code, codes.created)
+        stale.bottled = True
+        stale.save()
+        self.giveaway.refresh_from_db()
+        self.assertTrue(self.giveaway.bottled)
+        self.assertEqual(self.giveaway.bottles_claimed, 3)
+
+    def test_claim_closed(self):
+        Giveaway.objects.filter(id=self.giveaway.id).update(status=Giveaway.StatusChoices.CLOSED)
+        r = self.claim(1)
+        self.assertEqual(r.status_code, codes.bad)
+
+    def test_nearby(self):
+        Giveaway.objects.create(
+            creator=self.user,
+            brewer=self.giveaway.brewer,
+            brew=self.create_brew(),
+            bottles_available=10,
+            max_increment=4,
+            location=Point(-120.0, 40.0, srid=4326),  # Well over 20 miles away
+            status=Giveaway.StatusChoices.OPEN,
+        )
+        r = self.get(reverse_lazy("api-1.0.0:giveaways_nearby"))
+        self.assertEqual(r.status_code, codes.ok)
+        items = r.json()["items"]
+        self.assertEqual([item["id"] for item in items], [self.giveaway.id])
+        self.assertEqual(items[0]["remaining_bottles"], 10)
+
+        self.assertNotIn("distance", items[0])
+
+        r = self.get(f"{reverse_lazy('api-1.0.0:giveaways_nearby')}?within=200")
+        self.assertEqual(len(r.json()["items"]), 2)
+
+        # Searches always start from the caller's own profile
+        r = self.get(f"{reverse_lazy('api-1.0.0:giveaways_nearby')}?location=POINT(-120 40)&within=1")
+        self.assertEqual([item["id"] for item in r.json()["items"]], [self.giveaway.id])
+
+    def test_clusters(self):
+        for lon in (-121.40, -121.41, -121.60):
+            Giveaway.objects.create(
+                creator=self.user,
+                brewer=self.giveaway.brewer,
+                brew=self.create_brew(),
+                bottles_available=5,
+                max_increment=1,
+                location=Point(lon, 38.55, srid=4326),
+                status=Giveaway.StatusChoices.OPEN,
+            )
+        url = reverse_lazy("api-1.0.0:giveaways_clusters")
+        r = self.get(f"{url}?bbox=-122,38,-121,39&zoom=8")
+        self.assertEqual(r.status_code, codes.ok)
+        clusters = r.json()["clusters"]
+        self.assertEqual(sum(c["count"] for c in clusters), 4)
+        self.assertEqual(sum(c["remaining_bottles"] for c in clusters), 25)
+        self.assertLess(len(clusters), 4)
+
+        # Fully zoomed in, cells stay coarse enough not to pinpoint a giveaway
+        r = self.get(f"{url}?bbox=-121.401,38.549,-121.399,38.551&zoom=22")
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["cell_size"], MIN_CLUSTER_CELL_SIZE)
+
+        r = self.get(f"{url}?bbox=-122,38,-121&zoom=8")
+        self.assertEqual(r.status_code, codes.bad)
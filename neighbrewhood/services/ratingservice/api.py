@@ -0,0 +1,107 @@
+from django.db import IntegrityError, transaction
+from ninja import Router
+from ninja.responses import codes_4xx
+
+from brewers.models import Brewer
+from brews.models import Brew
+from common.schemas import DefaultError
+from ratings.models import BrewerRating, BrewerScore, BrewRating, BrewScore
+from services.common.auth import BrewerJWTAuth, StatelessBrewerJWTAuth
+from services.common.brewers_api import profile_required
+from .schemas import RatingCreateSchema, RatingResponseSchema, ScoreSchema
+
+
+ratings_router = Router(tags=["Brewers", "Ratings"])
+
+
+def rate(request, rating_model, target, data):
+    """
+    Create the caller's rating of ``target``, or change it if they already rated it. The
+    existing rating is locked while it changes; if a concurrent request inserts the first
+    rating in between, the unique constraint stops the duplicate and this one updates it.
+    """
+    try:
+        return _save_rating(request, rating_model, target, data)
+    except IntegrityError:
+        return _save_rating(request, rating_model, target, data)
+
+
+def _save_rating(request, rating_model, target, data):
+    field = rating_model.score_model.target_field
+    with transaction.atomic():
+        obj = rating_model.objects.select_for_update().filter(rater=request.user, **{field: target}).first()
+        if obj is None:
+            obj = rating_model(rater=request.user, creator=request.user, **{field: target})
+        obj.rating = data.rating
+        obj.review = data.review
+        obj.updater = request.user
+        obj.save()
+    return obj
+
+
+def score_of(score_model, target_id):
+    """The stored score of ``target_id``, or an empty one if it was never rated."""
+    score = score_model.objects.filter(pk=target_id).first()
+    return score or score_model(pk=target_id)
+
+# Brewers
+
+@ratings_router.post(
+    "brewers/{brewer_id}",
+    auth=BrewerJWTAuth(),
+    response={201: RatingResponseSchema, codes_4xx: DefaultError},
+    url_name="ratings_rate_brewer",
+)
+@profile_required
+def rate_brewer(request, brewer_id: int, rating: RatingCreateSchema):
+    try:
+        brewer = Brewer.objects.get(id=brewer_id)
+    except Brewer.DoesNotExist:
+        return 404, {"detail": f"Brewer {brewer_id} does not exist"}
+    if brewer.user_id == request.user.id:
+        return 403, {"detail": "You can't rate yourself"}
+    return 201, rate(request, BrewerRating, brewer, rating)
+
+
+@ratings_router.get(
+    "brewers/{brewer_id}/score",
+    auth=StatelessBrewerJWTAuth(),
+    response={200: ScoreSchema, codes_4xx: DefaultError},
+    url_name="ratings_brewer_score",
+)
+def brewer_score(request, brewer_id: int):
+    score = score_of(BrewerScore, brewer_id)
+    if score._state.adding and not Brewer.objects.filter(id=brewer_id).exists():
+        return 404, {"detail": f"Brewer {brewer_id} does not exist"}
+    return score
+
+# Brews
+
+@ratings_router.post(
+    "brews/{brew_id}",
+    auth=BrewerJWTAuth(),
+    response={201: RatingResponseSchema, codes_4xx: DefaultError},
+    url_name="ratings_rate_brew",
+)
+@profile_required
+def rate_brew(request, brew_id: int, rating: RatingCreateSchema):
+    try:
+        brew = Brew.objects.get(id=brew_id)
+    except Brew.DoesNotExist:
+        return 404, {"detail": f"Brew {brew_id} does not exist"}
+    if brew.is_brewed_by(request.user):
+        return 403, {"detail": "You can't rate your own brew"}
+    return 201, rate(request, BrewRating, brew, rating)
+
+
+@ratings_router.get(
+    "brews/{brew_id}/score",
+    auth=StatelessBrewerJWTAuth(),
+    response={200: ScoreSchema, codes_4xx: DefaultError},
+    url_name="ratings_brew_score",
+)
+def brew_score(request, brew_id: int):
+    score = score_of(BrewScore, brew_id)
+    if score._state.adding and not Brew.objects.filter(id=brew_id).exists():
+        return 404, {"detail": f"Brew {brew_id} does not exist"}
+    return score
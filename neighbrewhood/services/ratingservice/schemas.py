@@ -0,0 +1,39 @@
+from ninja import ModelSchema
+
+from ratings.models import BrewerRating, BrewerScore
+
+
+class ScoreSchema(ModelSchema):
+    class Meta:
+        model = BrewerScore
+        fields = [
+            "up",
+            "down",
+            "score",
+        ]
+
+
+class RatingCreateSchema(ModelSchema):
+    class Meta:
+        model = BrewerRating
+        fields = [
+            "rating",
+            "review",
+        ]
+
+
+class RatingResponseSchema(ModelSchema):
+    score: ScoreSchema
+
+    @staticmethod
+    def resolve_score(obj):
+        return obj.score_model.objects.get(pk=obj.target_id)
+
+    class Meta:
+        model = BrewerRating
+        fields = [
+            "id",
+            "rating",
+            "review",
+            "created",
+        ]
@@ -0,0 +1,101 @@
+from django.db import IntegrityError, transaction
+from django.urls import reverse_lazy
+from requests.status_codes import codes
+
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, SwapClaim
+from ratings.models import BrewerRating, BrewerScore, wilson_lower_bound
+from services.testing.ServiceTestBase import ServiceTestBase
+
+
+class RatingServiceTestCase(ServiceTestBase):
+    def setUp(self):
+        super().setUp()
+        self.owner = self.create_brewer()
+        self.brew = self.create_brew()
+
+        self.register_user()
+        self.obtain_access_token()
+        crt_brewer_url = reverse_lazy("api-1.0.0:users_create_brewer")
+        self.post(crt_brewer_url, self.brewer_details)
+
+    def rate_brewer(self, rating):
+        url = reverse_lazy("api-1.0.0:ratings_rate_brewer", args=[self.owner.id])
+        return self.post(url, {"rating": rating})
+
+    def brewer_score(self):
+        url = reverse_lazy("api-1.0.0:ratings_brewer_score", args=[self.owner.id])
+        return self.get(url).json()
+
+    def test_wilson_lower_bound(self):
+        self.assertEqual(wilson_lower_bound(0, 0), 0.0)
+        self.assertLess(wilson_lower_bound(1, 0), wilson_lower_bound(90, 10))
+        self.assertLess(wilson_lower_bound(5, 5), wilson_lower_bound(6, 4))
+
+    def test_rate_brewer(self):
+        self.assertEqual(self.brewer_score(), {"up": 0, "down": 0, "score": 0.0})
+
+        r = self.rate_brewer(True)
+        self.assertEqual(r.status_code, codes.created)
+        self.assertEqual(r.json()["score"]["up"], 1)
+
+        # Rating again changes the existing rating
+        self.rate_brewer(False)
+        score = self.brewer_score()
+        self.assertEqual((score["up"], score["down"]), (0, 1))
+        self.assertEqual(score["score"], wilson_lower_bound(0, 1))
+        self.assertEqual(BrewerRating.objects.count(), 1)
+
+        # A second rating by the same rater is refused by the database
+        rating = BrewerRating.objects.get()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            BrewerRating.objects.create(rater=rating.rater, brewer=self.owner, rating=True)
+
+        BrewerRating.objects.all().delete()
+        self.assertEqual(self.brewer_score(), {"up": 0, "down": 0, "score": 0.0})
+
+    def test_rate_brew(self):
+        url = reverse_lazy("api-1.0.0:ratings_rate_brew", args=[self.brew.id])
+        self.assertEqual(self.post(url, {"rating": True, "review": "Great"}).status_code, codes.created)
+        r = self.get(reverse_lazy("api-1.0.0:ratings_brew_score", args=[self.brew.id]))
+        self.assertEqual(r.json()["up"], 1)
+
+        r = self.get(reverse_lazy("api-1.0.0:ratings_brew_score", args=[self.brew.id + 1000]))
+        self.assertEqual(r.status_code, codes.not_found)
+
+    def test_rebuild_scores(self):
+        self.rate_brewer(True)
+        BrewerScore.objects.update(up=7)
+        BrewerScore.objects.rebuild()
+        self.assertEqual(self.brewer_score()["up"], 1)
+
+    def test_swap_scores(self):
+        self.rate_brewer(True)
+        BrewSwap.objects.create(
+            creator=self.user, brew=self.brew, total_bottles=12, status=BrewSwapStatusChoices.LIVE,
+        )
+        r = self.get(reverse_lazy("api-1.0.0:brewswaps_swaps"))
+        item = r.json()["items"][0]
+        self.assertEqual(item["creator_score"]["up"], 1)
+        self.assertIsNone(item["brew_score"])
+
+        # The denormalized feed carries the same scores, and follows rating changes
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rate_brewer(False)
+        feed_item = self.get(reverse_lazy("api-1.0.0:brewswaps_feed")).json()["items"][0]
+        self.assertEqual(feed_item["creator_score"], {"up": 0, "down": 1, "score": wilson_lower_bound(0, 1)})
+        self.assertIsNone(feed_item["brew_score"])
+
+    def test_claim_detail_tracks_scores(self):
+        swap = BrewSwap.objects.create(
+            creator=self.user, brew=self.brew, total_bottles=12, status=BrewSwapStatusChoices.LIVE,
+        )
+        claim = SwapClaim.objects.create(creator=self.user, brew=self.create_brew(), swap=swap, num_bottles=2)
+        url = reverse_lazy("api-1.0.0:claims_claim_detail", args=[claim.id])
+        r = self.get(url)
+        self.assertIsNone(r.json()["swap"]["creator_score"])
+
+        # Rating the swap's creator changes the nested swap, so the old ETag no longer matches
+        self.rate_brewer(True)
+        r = self.get(url, {"If-None-Match": r["ETag"]})
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["swap"]["creator_score"]["up"], 1)
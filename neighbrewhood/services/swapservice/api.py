@@ -1,11 +1,11 @@
-from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.geos import GEOSGeometry
 from django.contrib.gis.measure import D
 from django.db.models import Q
+from django.http import HttpResponse
 from ninja import Router
+from ninja.errors import HttpError
 from ninja.pagination import paginate
 from ninja.responses import codes_4xx
-from ninja_jwt.authentication import JWTAuth
 from typing import List
 
 from brews.models import Brew
@@ -14,15 +14,24 @@ from brewswaps.models import (
     BrewSwapStatusChoices,
     ClaimStatusChoices,
     SwapClaim,
+    SwapFeedRow,
 )
+from common.pagination import KeysetPagination
 from common.schemas import DefaultError, DefaultSuccess
+from services.common.auth import BrewerJWTAuth, StatelessBrewerJWTAuth
 from services.common.brewers_api import profile_required
+from services.common.conditional import conditional, object_validators
 from .schemas import (
     BrewSwapCreateSchema,
     BrewSwapResponseSchema,
     BrewSwapDetailResponseSchema,
+    ClaimDecision,
+    ClaimReviewResponseSchema,
+    ClaimReviewSchema,
+    NearbyOrder,
     SwapClaimCreateSchema,
     SwapClaimResponseSchema,
+    SwapFeedResponseSchema,
 )
 
 
@@ -36,7 +45,7 @@ swap_router = Router(tags=["Brewers", "Swaps"])
 
 @swap_router.post(
     "createSwap", 
-    auth=JWTAuth(), 
+    auth=BrewerJWTAuth(), 
     response={201: BrewSwapResponseSchema, codes_4xx: DefaultError},
     url_name="brewswaps_create_swap",
 )
@@ -54,75 +63,107 @@ def create_swap(request, swap: BrewSwapCreateSchema):
         brew=brew,
         total_bottles=swap.total_bottles,
         creator=request.user,
+        location=request.brewer.location,
     )
     if swap.max_increment:
         swap_obj.max_increment = swap.max_increment
     
     swap_obj.save()
-    return 201, swap_obj
+    return 201, BrewSwap.objects.for_listing().get(id=swap_obj.id)
 
 # Retrieve (List)
 
 @swap_router.get(
     "",
-    auth=JWTAuth(),
+    auth=StatelessBrewerJWTAuth(),
     response={200: List[BrewSwapResponseSchema], codes_4xx: DefaultError},
     url_name="brewswaps_swaps",
 )
 @profile_required
-@paginate
+@paginate(KeysetPagination)
 def swaps(request):
-    return BrewSwap.objects.all()
+    return BrewSwap.objects.for_listing()
+
+@swap_router.get(
+    "feed",
+    auth=StatelessBrewerJWTAuth(),
+    response={200: List[SwapFeedResponseSchema], codes_4xx: DefaultError},
+    url_name="brewswaps_feed",
+)
+@profile_required
+@paginate(KeysetPagination, ordering=("-created", "-swap_id"))
+def swap_feed(request, status: BrewSwapStatusChoices = None):
+    rows = SwapFeedRow.objects.all()
+    if status:
+        rows = rows.filter(status=status)
+    return rows
 
 @swap_router.get(
     "mySwaps",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: List[BrewSwapResponseSchema], codes_4xx: DefaultError},
     url_name="brewswaps_my_swaps",
 )
 @profile_required
-@paginate
+@paginate(KeysetPagination)
 def my_swaps(request):
-    return BrewSwap.objects.filter(creator=request.user).select_related("brew")
+    return BrewSwap.objects.filter(creator=request.user).for_listing()
 
 @swap_router.get(
     "nearbySwaps",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: List[BrewSwapResponseSchema], codes_4xx: DefaultError},
     url_name="brewswaps_nearby_swaps",
 )
 @profile_required
-@paginate
-def nearby_swaps(request, location: str = None, within: int = None):
+@paginate(KeysetPagination, ordering=("distance", "id"), orderings={NearbyOrder.RANK: ("-rank", "id")})
+def nearby_swaps(request, location: str = None, within: int = None, order: NearbyOrder = NearbyOrder.DISTANCE):
     if location:
         try:
             location = GEOSGeometry(location)
         except:
-            return 400, {'detail': f'Location {location} improperly formatted. Use SRID'}
+            raise HttpError(400, f'Location {location} improperly formatted. Use SRID')
     else:
-        location = request.user.brewer.location
+        location = request.brewer.location
     
     if not within:
         within = 20 # Default to within 20 miles
 
     query = BrewSwap.objects.filter(~Q(creator=request.user), status=BrewSwapStatusChoices.LIVE)
-    query = query.filter(creator__brewer__location__distance_lte=(location, D(mi=within)))
-    query = query.annotate(distance=Distance("creator__brewer__location", location)).order_by("distance")
-    query = query.select_related("brew")
-    return query
+    if order == NearbyOrder.RANK:
+        query = query.ranked_nearby(location, D(mi=within))
+    else:
+        query = query.nearby(location, D(mi=within))
+    return query.for_listing()
 
 # Retrieve (detail)
 
 @swap_router.get(
     "{swap_id}",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: BrewSwapDetailResponseSchema, codes_4xx: DefaultError},
     url_name="brewswaps_detail",
 )
 @profile_required
-def swap_detail(request, swap_id: int):
+@conditional(
+    validators=object_validators(
+        "swap", BrewSwap.objects, "swap_id",
+        timestamps=(
+            "updated", "brew__updated", "brew__brew_type__updated", "brew__qualities__updated", "claims__updated",
+            "brew__score__updated", "creator__brewer__score__updated",
+        ),
+        counts=("claims", "brew__qualities"),
+        values=(
+            "creator__username", "creator__email", "creator__first_name",
+            "brew__creator__username", "brew__creator__email", "brew__creator__first_name",
+        ),
+        query_params=("schema",),
+    ),
+    cache_schema=BrewSwapDetailResponseSchema,
+)
+def swap_detail(request, swap_id: int, response: HttpResponse):
     try:
-        swap = BrewSwap.objects.get(id=swap_id)
+        swap = BrewSwap.objects.for_listing().get(id=swap_id)
     except BrewSwap.DoesNotExist:
         return 400, {"detail": f"This swap (id: {swap_id}) does not exist"}
     return swap
@@ -131,7 +172,7 @@ def swap_detail(request, swap_id: int):
 
 @swap_router.get(
     "{swap_id}/set_live",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: DefaultSuccess, codes_4xx: DefaultError},
     url_name="brewswaps_set_live",
 )
@@ -150,7 +191,7 @@ def set_swap_live(request, swap_id: int):
 
 @swap_router.get(
     "{swap_id}/set_complete",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: DefaultSuccess, codes_4xx: DefaultError},
     url_name="brewswaps_set_complete",
 )
@@ -169,7 +210,7 @@ def set_swap_complete(request, swap_id: int):
 
 @swap_router.get(
     "{swap_id}/set_inactive",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={200: DefaultSuccess, codes_4xx: DefaultError},
     url_name="brewswaps_set_inactive",
 )
@@ -192,7 +233,7 @@ def set_swap_inactive(request, swap_id: int):
 
 @swap_router.post(
     "{swap_id}/claim",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={201: SwapClaimResponseSchema, codes_4xx: DefaultError},
     url_name="brewswaps_claim",
 )
@@ -224,11 +265,11 @@ def swap_claim(request, swap_id: int, claim: SwapClaimCreateSchema):
         num_bottles=claim.num_bottles,
     )
 
-    return 201, claim
+    return 201, SwapClaim.objects.for_listing().get(id=claim.id)
 
 @swap_router.get(
     "{swap_id}/claims",
-    auth=JWTAuth(),
+    auth=BrewerJWTAuth(),
     response={
         200: List[SwapClaimResponseSchema],
         204: DefaultSuccess, 
@@ -238,8 +279,42 @@ def swap_claim(request, swap_id: int, claim: SwapClaimCreateSchema):
 )
 @profile_required
 def swap_claims(request, swap_id: int):
-    swap = BrewSwap.objects.get(id=swap_id)
-    claims = getattr(swap, "claims", None)
-    if claims is None:
+    claims = list(SwapClaim.objects.filter(swap_id=swap_id).for_listing().order_by("-created", "-id"))
+    if not claims:
+        if not BrewSwap.objects.filter(id=swap_id).exists():
+            return 404, {"detail": f"BrewSwap {swap_id} doesn't exist"}
         return 204, {"message": "No claims currently"}
     return 200, claims
+
+@swap_router.post(
+    "{swap_id}/claims/review",
+    auth=BrewerJWTAuth(),
+    response={200: ClaimReviewResponseSchema, codes_4xx: DefaultError},
+    url_name="brewswaps_review_claims",
+)
+@profile_required
+def review_claims(request, swap_id: int, review: ClaimReviewSchema):
+    try:
+        swap = BrewSwap.objects.get(id=swap_id)
+    except BrewSwap.DoesNotExist:
+        return 404, {"detail": f"BrewSwap {swap_id} doesn't exist"}
+    if request.user.id != swap.creator_id:
+        return 403, {"detail": "You can't review claims for a swap you didn't create"}
+
+    decisions = {}
+    for item in review.claims:
+        if item.claim in decisions:
+            return 400, {"detail": f"Claim {item.claim} is listed more than once"}
+        accept = item.decision == ClaimDecision.ACCEPT
+        decisions[item.claim] = ClaimStatusChoices.ACCEPTED if accept else ClaimStatusChoices.REJECTED
+
+    outcomes = swap.review_claims(decisions)
+    results = [
+        {"claim": item.claim, "changed": outcomes[item.claim][0], "detail": outcomes[item.claim][1]}
+        for item in review.claims
+    ]
+    return 200, {
+        "accepted_bottles": swap.accepted_bottles,
+        "bottles_available": swap.bottles_available,
+        "results": results,
+    }
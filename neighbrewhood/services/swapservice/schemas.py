@@ -1,13 +1,20 @@
-from typing import Dict
-from django.urls import reverse_lazy, reverse
-from ninja import ModelSchema
+from django.core.exceptions import ObjectDoesNotExist
+from enum import Enum
+from typing import Dict, List, Optional
+from ninja import Field, ModelSchema, Schema
 
-from brewswaps.models import BrewSwap, SwapClaim
-from common.schemas import ActionUrlSchema, HttpMethod, make_action
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, SwapClaim
+from common.schemas import ActionUrlSchema, HttpMethod, make_action, schema_documents, url_templates
 from services.brewservice.schemas import BrewResponseSchema
+from services.ratingservice.schemas import ScoreSchema
 from services.users.schemas import UserLimitedSchema
 
 
+class NearbyOrder(str, Enum):
+    DISTANCE = "distance"
+    RANK = "rank"  ## Distance, freshness, bottles available and the creator's rating combined
+
+
 class BrewSwapCreateSchema(ModelSchema):
     brew: int
     max_increment: int = None
@@ -26,8 +33,12 @@ class BrewSwapResponseSchema(ModelSchema):
     bottles_available: int
     creator: UserLimitedSchema
     distance: float = None
+    rank: float = None
     detail: ActionUrlSchema
     claims: int
+    claims_by_status: Dict[str, int]
+    creator_score: ScoreSchema = None
+    brew_score: ScoreSchema = None
 
     @staticmethod
     def resolve_bottles_available(obj):
@@ -35,19 +46,39 @@ class BrewSwapResponseSchema(ModelSchema):
     
     @staticmethod
     def resolve_distance(obj):
-        return float(obj.distance.m)
+        distance = getattr(obj, "distance", None)
+        if distance is None:
+            return None
+        return float(distance)
     
+    @staticmethod
+    def resolve_rank(obj):
+        return getattr(obj, "rank", None)
+
     @staticmethod
     def resolve_detail(obj):
-        url = reverse_lazy("api-1.0.0:brewswaps_detail", args=[obj.id])
-        return make_action(HttpMethod.GET, str(url))
+        url = url_templates.url("api-1.0.0:brewswaps_detail", obj.id)
+        return make_action(HttpMethod.GET, url)
     
     @staticmethod
     def resolve_claims(obj):
-        claims = getattr(obj, "claims", None)
-        if claims is not None:
-            return claims.count()
-        return 0
+        # Set on each swap of a page by BrewSwapQuerySet.for_listing; load swaps through it
+        return sum(obj.claims_by_status.values())
+
+    @staticmethod
+    def resolve_creator_score(obj):
+        # Joined in by BrewSwapQuerySet.for_listing; None until the creator is first rated
+        try:
+            return obj.creator.brewer.score if obj.creator else None
+        except ObjectDoesNotExist:
+            return None
+
+    @staticmethod
+    def resolve_brew_score(obj):
+        try:
+            return obj.brew.score
+        except ObjectDoesNotExist:
+            return None
 
     class Meta:
         model = BrewSwap
@@ -60,6 +91,32 @@ class BrewSwapResponseSchema(ModelSchema):
         ]
 
 
+class SwapFeedResponseSchema(Schema):
+    """BrewSwapResponseSchema's shape, read from a SwapFeedRow instead of the swap and its relations."""
+    brew: BrewResponseSchema
+    total_bottles: int
+    max_increment: int
+    creator: UserLimitedSchema = None
+    status: BrewSwapStatusChoices
+    bottles_available: int
+    distance: float = None
+    rank: float = None
+    detail: ActionUrlSchema
+    claims: int
+    claims_by_status: Dict[str, int]
+    creator_score: ScoreSchema = None
+    brew_score: ScoreSchema = None
+
+    @staticmethod
+    def resolve_detail(obj):
+        url = url_templates.url("api-1.0.0:brewswaps_detail", obj.swap_id)
+        return make_action(HttpMethod.GET, url)
+
+    @staticmethod
+    def resolve_claims(obj):
+        return obj.claims_count
+
+
 class BrewSwapDetailResponseSchema(BrewSwapResponseSchema):
     actions: Dict[str, ActionUrlSchema] = None
 
@@ -67,21 +124,28 @@ class BrewSwapDetailResponseSchema(BrewSwapResponseSchema):
     def resolve_actions(obj, context):
         request = context["request"]
         if request.user == obj.creator:
-            setlive_url = reverse_lazy("api-1.0.0:brewswaps_set_live", args=[obj.id])
-            setcomplete_url = reverse_lazy("api-1.0.0:brewswaps_set_complete", args=[obj.id])
-            setinactive_url = reverse_lazy("api-1.0.0:brewswaps_set_inactive", args=[obj.id])
+            setlive_url = url_templates.url("api-1.0.0:brewswaps_set_live", obj.id)
+            setcomplete_url = url_templates.url("api-1.0.0:brewswaps_set_complete", obj.id)
+            setinactive_url = url_templates.url("api-1.0.0:brewswaps_set_inactive", obj.id)
             ret = {
-                "set_live": make_action(HttpMethod.GET, str(setlive_url)),
-                "set_complete": make_action(HttpMethod.GET, str(setcomplete_url)),
-                "set_inactive": make_action(HttpMethod.GET, str(setinactive_url)),
+                "set_live": make_action(HttpMethod.GET, setlive_url),
+                "set_complete": make_action(HttpMethod.GET, setcomplete_url),
+                "set_inactive": make_action(HttpMethod.GET, setinactive_url),
             }
         else:
-            make_claim_url = reverse_lazy("api-1.0.0:brewswaps_claim", args=[obj.id])
+            make_claim_url = url_templates.url("api-1.0.0:brewswaps_claim", obj.id)
+            # ?schema=ref leaves the claim schema out, for clients that fetched it from schema_ref
+            inline = request.GET.get("schema") != "ref"
             ret = {
-                "make_claim": make_action(HttpMethod.POST, str(make_claim_url), SwapClaimCreateSchema.json_schema())
+                "make_claim": make_action(
+                    HttpMethod.POST,
+                    make_claim_url,
+                    schema_documents.document(SwapClaimCreateSchema) if inline else None,
+                    schema_documents.ref(SwapClaimCreateSchema),
+                )
             }
-        claims_url = reverse_lazy("api-1.0.0:brewswaps_claims", args=[obj.id])
-        ret["get_claims"] = make_action(HttpMethod.GET, str(claims_url))
+        claims_url = url_templates.url("api-1.0.0:brewswaps_claims", obj.id)
+        ret["get_claims"] = make_action(HttpMethod.GET, claims_url)
         return ret
     
 
@@ -97,6 +161,9 @@ class SwapClaimCreateSchema(ModelSchema):
             "num_bottles",
         ]
 
+
+schema_documents.register(SwapClaimCreateSchema)
+
     
 class SwapClaimResponseSchema(ModelSchema):
     brew: BrewResponseSchema
@@ -108,14 +175,14 @@ class SwapClaimResponseSchema(ModelSchema):
     def resolve_actions(obj, context):
         request = context["request"]
         if request.user != obj.creator:
-            accept_url = reverse_lazy("api-1.0.0:claims_accept_claim", args=[obj.id])
+            accept_url = url_templates.url("api-1.0.0:claims_accept_claim", obj.id)
             return {
-                "accept": make_action(HttpMethod.GET, str(accept_url))
+                "accept": make_action(HttpMethod.GET, accept_url)
             }
         else:
-            cancel_url = reverse_lazy("api-1.0.0:claims_cancel_claim", args=[obj.id])
+            cancel_url = url_templates.url("api-1.0.0:claims_cancel_claim", obj.id)
             return {
-                "cancel": make_action(HttpMethod.GET, str(cancel_url))
+                "cancel": make_action(HttpMethod.GET, cancel_url)
             }
         return {}
 
@@ -128,3 +195,29 @@ class SwapClaimResponseSchema(ModelSchema):
             "status",
             "creator"
         ]
+
+
+class ClaimDecision(str, Enum):
+    ACCEPT = "accept"
+    REJECT = "reject"
+
+
+class ClaimReviewItemSchema(Schema):
+    claim: int
+    decision: ClaimDecision
+
+
+class ClaimReviewSchema(Schema):
+    claims: List[ClaimReviewItemSchema] = Field(..., min_length=1, max_length=BrewSwap.MAX_CLAIM_REVIEW)
+
+
+class ClaimReviewResultSchema(Schema):
+    claim: int
+    changed: bool
+    detail: Optional[str] = None
+
+
+class ClaimReviewResponseSchema(Schema):
+    accepted_bottles: int
+    bottles_available: int
+    results: List[ClaimReviewResultSchema]
@@ -1,10 +1,22 @@
+import base64
+import json
 import jsonschema
 
 from datetime import date
+from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 from requests.status_codes import codes
-from brewswaps.models import BrewSwapStatusChoices, ClaimStatusChoices
+from brewers.models import Brewer
+from brews.models import Brew
+from brewswaps.models import BrewSwap, BrewSwapStatusChoices, ClaimStatusChoices, SwapClaim
+from common.metrics import metrics
+from common.schemas import schema_documents
+from services.swapservice.schemas import SwapClaimCreateSchema
 from services.testing.ServiceTestBase import ServiceTestBase
 
 
@@ -58,6 +70,261 @@ class BrewSwapServiceTestCase(ServiceTestBase):
         r = self.post(crt_swap_url, swap_data)
         return r
 
+    def create_swaps_directly(self, num_swaps):
+        for _ in range(num_swaps):
+            brew = Brew.objects.create(creator=self.user, brew_type=self.brew_types[0])
+            brew.qualities.set(self.qualities)
+            BrewSwap.objects.create(creator=self.user, brew=brew, total_bottles=12)
+
+    def test_swap_list_query_count(self):
+        swaps_url = reverse_lazy("api-1.0.0:brewswaps_swaps")
+
+        def count_page_queries(page_size):
+            with CaptureQueriesContext(connection) as ctx:
+                r = self.get(f"{swaps_url}?limit={page_size}")
+            self.assertEqual(r.status_code, codes.ok)
+            self.assertEqual(len(r.json()["items"]), page_size)
+            return len(ctx.captured_queries)
+
+        self.create_swaps_directly(2)
+        small_page = count_page_queries(2)
+        self.create_swaps_directly(18)
+        large_page = count_page_queries(20)
+        self.assertEqual(small_page, large_page)
+
+    def test_swap_claims_by_status(self):
+        self.create_swaps_directly(3)
+        swap = BrewSwap.objects.order_by("-created", "-id").first()
+        for status in (ClaimStatusChoices.PENDING, ClaimStatusChoices.PENDING, ClaimStatusChoices.REJECTED):
+            brew = Brew.objects.create(creator=self.user, brew_type=self.brew_types[0])
+            SwapClaim.objects.create(creator=self.user, brew=brew, swap=swap, num_bottles=1, status=status)
+
+        swaps_url = reverse_lazy("api-1.0.0:brewswaps_swaps")
+        self.obtain_access_token()  # Carries the brewer claims
+        with self.assertNumQueries(3):  # Page, qualities prefetch and claim summary
+            r = self.get(swaps_url)
+        first, second = r.json()["items"][:2]
+        self.assertEqual(first["claims"], 3)
+        self.assertEqual(first["claims_by_status"], {
+            ClaimStatusChoices.PENDING: 2,
+            ClaimStatusChoices.ACCEPTED: 0,
+            ClaimStatusChoices.REJECTED: 1,
+            ClaimStatusChoices.CANCELED: 0,
+        })
+        self.assertEqual(second["claims"], 0)
+
+    def test_swaps_stateless_auth(self):
+        swaps_url = reverse_lazy("api-1.0.0:brewswaps_swaps")
+
+        # This token was issued before the brewer profile existed, so the profile is looked up
+        r = self.get(swaps_url)
+        self.assertEqual(r.status_code, codes.ok)
+
+        # A fresh token carries the brewer claims: only the page query runs
+        self.obtain_access_token()
+        with self.assertNumQueries(1):
+            r = self.get(swaps_url)
+        self.assertEqual(r.status_code, codes.ok)
+
+        # A still valid token of a user deleted since is refused once the user is loaded
+        self.register_user(username="gone", email="gone@example.com")
+        self.obtain_access_token(username="gone")
+        get_user_model().objects.filter(username="gone").delete()
+        r = self.get(swaps_url)
+        self.assertEqual(r.status_code, codes.unauthorized)
+
+    def test_swap_list_cursor(self):
+        self.create_swaps_directly(5)
+        swaps_url = reverse_lazy("api-1.0.0:brewswaps_swaps")
+
+        r = self.get(f"{swaps_url}?limit=2&count=true")
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["count"], 5)
+
+        seen = r.json()["items"]
+        next_cursor = r.json()["next"]
+        while next_cursor:
+            r = self.get(f"{swaps_url}?limit=2&cursor={next_cursor}")
+            self.assertEqual(r.status_code, codes.ok)
+            self.assertIsNone(r.json()["count"])
+            seen.extend(r.json()["items"])
+            next_cursor = r.json()["next"]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len({s["detail"]["url"] for s in seen}), 5)
+
+        r = self.get(f"{swaps_url}?cursor=not-a-cursor")
+        self.assertEqual(r.status_code, codes.bad)
+
+        # Well formed cursors whose values don't fit the ("-created", "-id") ordering
+        for values in (["yesterday", 1], [1, 2], ["2026-01-01T00:00:00+00:00", "1"], [None, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            r = self.get(f"{swaps_url}?cursor={cursor}")
+            self.assertEqual(r.status_code, codes.bad, values)
+
+    def test_swap_detail_urls(self):
+        self.create_swaps_directly(2)
+        r = self.get(reverse_lazy("api-1.0.0:brewswaps_swaps"))
+        for item in r.json()["items"]:
+            swap_id = int(item["detail"]["url"].rstrip("/").rsplit("/", 1)[-1])
+            self.assertEqual(item["detail"]["url"], reverse_lazy("api-1.0.0:brewswaps_detail", args=[swap_id]))
+            self.assertTrue(BrewSwap.objects.filter(id=swap_id).exists())
+
+    def test_nearby_ranked(self):
+        Brewer.objects.create(creator=self.user, user=self.user, location=self.loc, phone_number="+15405551212")
+        for total_bottles in (24, 2):
+            brew = Brew.objects.create(creator=self.user, brew_type=self.brew_types[0])
+            BrewSwap.objects.create(
+                creator=self.user, brew=brew, total_bottles=total_bottles, status=BrewSwapStatusChoices.LIVE,
+            )
+
+        nearby_url = reverse_lazy("api-1.0.0:brewswaps_nearby_swaps")
+        r = self.get(f"{nearby_url}?order=rank&limit=1")
+        self.assertEqual(r.status_code, codes.ok)
+        first = r.json()["items"][0]
+        self.assertEqual(first["total_bottles"], 24)  # Same distance and age, more bottles
+        self.assertIsNotNone(first["rank"])
+
+        r = self.get(f"{nearby_url}?order=rank&limit=1&cursor={r.json()['next']}")
+        self.assertEqual(r.json()["items"][0]["total_bottles"], 2)
+        self.assertIsNone(r.json()["next"])
+
+        r = self.get(f"{nearby_url}?order=bogus")
+        self.assertEqual(r.status_code, codes.unprocessable_entity)
+
+        r = self.get(f"{nearby_url}?location=nowhere")
+        self.assertEqual(r.status_code, codes.bad)
+        self.assertIn("improperly formatted", r.json()["detail"])
+
+    def test_swap_feed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_swaps_directly(3)
+        swaps = self.get(reverse_lazy("api-1.0.0:brewswaps_swaps")).json()["items"]
+
+        feed_url = reverse_lazy("api-1.0.0:brewswaps_feed")
+        self.obtain_access_token()  # Carries the brewer claims, so only the feed query runs
+        with self.assertNumQueries(1):
+            r = self.get(feed_url)
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["items"], swaps)
+
+        swap = BrewSwap.objects.order_by("-created", "-id").first()
+        with self.captureOnCommitCallbacks(execute=True):
+            swap.set_live()
+        r = self.get(f"{feed_url}?status={BrewSwapStatusChoices.LIVE}")
+        self.assertEqual([item["detail"]["url"] for item in r.json()["items"]], [swaps[0]["detail"]["url"]])
+
+    def test_swap_detail_conditional_get(self):
+        self.create_swaps_directly(1)
+        swap = BrewSwap.objects.get()
+        detail_url = reverse_lazy("api-1.0.0:brewswaps_detail", args=[swap.id])
+
+        r = self.get(detail_url)
+        self.assertEqual(r.status_code, codes.ok)
+        etag = r["ETag"]
+
+        r = self.get(detail_url, {"If-None-Match": etag})
+        self.assertEqual(r.status_code, codes.not_modified)
+
+        brew = Brew.objects.create(creator=self.user, brew_type=self.brew_types[0])
+        SwapClaim.objects.create(creator=self.user, brew=brew, swap=swap, num_bottles=2)
+        r = self.get(detail_url, {"If-None-Match": etag})
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["claims"], 1)
+        self.assertNotEqual(r["ETag"], etag)
+
+        # Neither users nor brew types have a timestamp the ETag could follow
+        etag = r["ETag"]
+        swap.creator.first_name = "Renamed"
+        swap.creator.save()
+        r = self.get(detail_url, {"If-None-Match": etag})
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["creator"]["first_name"], "Renamed")
+
+        etag = r["ETag"]
+        self.brew_types[0].value = "Renamed"
+        self.brew_types[0].save()
+        r = self.get(detail_url, {"If-None-Match": etag})
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["brew"]["brew_type"]["value"], "Renamed")
+
+    def test_swap_claims(self):
+        self.create_swaps_directly(1)
+        swap = BrewSwap.objects.get()
+        claims_url = reverse_lazy("api-1.0.0:brewswaps_claims", args=[swap.id])
+        self.assertEqual(self.get(claims_url).status_code, codes.no_content)
+
+        def add_claim():
+            brew = Brew.objects.create(creator=self.user, brew_type=self.brew_types[0])
+            SwapClaim.objects.create(creator=self.user, brew=brew, swap=swap, num_bottles=1)
+
+        add_claim()
+        with CaptureQueriesContext(connection) as one:
+            r = self.get(claims_url)
+        self.assertEqual(r.json()[0]["swap"]["claims"], 1)
+        add_claim()
+        add_claim()
+        # Every nested swap comes with its summary and scores, so more claims cost no more queries
+        with CaptureQueriesContext(connection) as three:
+            r = self.get(claims_url)
+        self.assertEqual([c["swap"]["claims"] for c in r.json()], [3, 3, 3])
+        self.assertEqual(len(three.captured_queries), len(one.captured_queries))
+
+        r = self.get(reverse_lazy("api-1.0.0:brewswaps_claims", args=[swap.id + 1000]))
+        self.assertEqual(r.status_code, codes.not_found)
+
+    def test_claim_detail_tracks_sibling_claims(self):
+        self.create_swaps_directly(1)
+        swap = BrewSwap.objects.get()
+        claim, sibling = (
+            SwapClaim.objects.create(
+                creator=self.user, brew=Brew.objects.create(creator=self.user, brew_type=self.brew_types[0]),
+                swap=swap, num_bottles=1,
+            )
+            for _ in range(2)
+        )
+        detail_url = reverse_lazy("api-1.0.0:claims_claim_detail", args=[claim.id])
+        r = self.get(detail_url)
+        self.assertEqual(r.json()["swap"]["claims_by_status"][ClaimStatusChoices.REJECTED], 0)
+
+        # Rejecting a pending sibling moves no bottles, so only the claim rows change
+        sibling.reject()
+        r = self.get(detail_url, {"If-None-Match": r["ETag"]})
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["swap"]["claims_by_status"][ClaimStatusChoices.REJECTED], 1)
+
+    @override_settings(RESPONSE_CACHE_ALIAS="default")
+    def test_swap_detail_response_cache(self):
+        caches["default"].clear()
+        self.create_swaps_directly(1)
+        detail_url = reverse_lazy("api-1.0.0:brewswaps_detail", args=[BrewSwap.objects.get().id])
+
+        with CaptureQueriesContext(connection) as first:
+            first_r = self.get(detail_url)
+        with CaptureQueriesContext(connection) as cached:
+            cached_r = self.get(detail_url)
+        self.assertEqual(cached_r.json(), first_r.json())
+        self.assertLess(len(cached.captured_queries), len(first.captured_queries))
+
+    @override_settings(METRICS_ENABLED=True, METRICS_QUERY_THRESHOLD=0)
+    def test_metrics(self):
+        metrics.clear()
+        with self.assertLogs("common.metrics", "WARNING"):
+            self.get(reverse_lazy("api-1.0.0:brewswaps_swaps"))
+
+        r = self.get(reverse_lazy("api-1.0.0:metrics"))
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertIn('neighbrewhood_requests_total{route="brewswaps_swaps"} 1', r.content.decode())
+
+    def test_schema_ref(self):
+        ref = schema_documents.ref(SwapClaimCreateSchema)
+        r = self.get(ref)
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json(), SwapClaimCreateSchema.json_schema())
+        self.assertIn("immutable", r["Cache-Control"])
+
+        r = self.get(ref, {"If-None-Match": r["ETag"]})
+        self.assertEqual(r.status_code, codes.not_modified)
+
     def test_create_swap_basic(self):
         r = self.create_brew()
         brew_id = r.json()['id']
@@ -91,6 +358,47 @@ class BrewSwapServiceTestCase(ServiceTestBase):
         self.assertEqual(r.json()["status"], BrewSwapStatusChoices.LIVE)
 
     
+    def test_review_claims(self):
+        brew_id = self.create_brew().json()["id"]
+        self.create_swap(brew_id, total_bottles=10)
+        swap = BrewSwap.objects.get(brew_id=brew_id)
+
+        def claim(creator, num_bottles):
+            brew = Brew.objects.create(creator=creator, brew_type=self.brew_types[0])
+            return SwapClaim.objects.create(creator=creator, brew=brew, swap=swap, num_bottles=num_bottles)
+
+        first, second, third = claim(self.user, 6), claim(self.user, 6), claim(self.user, 2)
+        own = claim(swap.creator, 1)  # Only possible directly; the claim endpoint refuses it
+
+        review_url = reverse_lazy("api-1.0.0:brewswaps_review_claims", args=[swap.id])
+        r = self.post(review_url, {"claims": [
+            {"claim": first.id, "decision": "accept"},
+            {"claim": second.id, "decision": "accept"},
+            {"claim": third.id, "decision": "reject"},
+            {"claim": own.id, "decision": "accept"},
+        ]})
+        self.assertEqual(r.status_code, codes.ok)
+        self.assertEqual(r.json()["accepted_bottles"], 6)
+        results = {result["claim"]: result for result in r.json()["results"]}
+        self.assertTrue(results[first.id]["changed"])
+        self.assertEqual(results[second.id]["detail"], "Not enough bottles available")
+        self.assertTrue(results[third.id]["changed"])
+        self.assertEqual(results[own.id]["detail"], "You can't accept your own claim")
+        self.assertEqual(SwapClaim.objects.get(id=third.id).status, ClaimStatusChoices.REJECTED)
+
+        r = self.post(review_url, {"claims": [
+            {"claim": first.id, "decision": "reject"},
+            {"claim": first.id, "decision": "accept"},
+        ]})
+        self.assertEqual(r.status_code, codes.bad)
+
+        # Only the swap's creator may review
+        self.register_user(username="other_user", email="other@user.com")
+        self.obtain_access_token(username="other_user")
+        self.create_brewer()
+        r = self.post(review_url, {"claims": [{"claim": first.id, "decision": "reject"}]})
+        self.assertEqual(r.status_code, codes.forbidden)
+
     def test_my_swaps(self):
         # Create swap for one user
         r = self.create_brew()
@@ -185,6 +493,7 @@ class BrewSwapServiceTestCase(ServiceTestBase):
         r = self.get(det_url)
         claim_url = r.json()["actions"]["make_claim"]["url"]
         claim_schema = r.json()["actions"]["make_claim"]["schema"]
+        self.assertEqual(self.get(r.json()["actions"]["make_claim"]["schema_ref"]).json(), claim_schema)
 
         # Make a claim 1: create brew
         r = self.create_brew()
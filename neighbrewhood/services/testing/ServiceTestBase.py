@@ -24,7 +24,7 @@ class ServiceTestBase(ModelTestBase):
             "first_name": self.first_name,
             "last_name": self.last_name,
         }
-        self.loc = Point(38.518681, -121.498772, srid=4326)
+        self.loc = Point(-121.498772, 38.518681, srid=4326)
         self.brewer_details = {
             "location_str": str(self.loc),
             "phone_number": "+15402725555",
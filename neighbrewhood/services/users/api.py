@@ -3,10 +3,10 @@ from django.contrib.gis.geos import GEOSGeometry
 
 from ninja import Router
 from ninja.responses import codes_4xx
-from ninja_jwt.authentication import JWTAuth
 
 from common.schemas import DefaultError
 from brewers.models import Brewer
+from services.common.auth import BrewerJWTAuth
 from services.common.brewers_api import profile_required
 from .schemas import BrewerResponseSchema, CreateBrewerSchema, UserSchema, UserRegisterSchema
 
@@ -16,7 +16,7 @@ User = get_user_model()
 
 @users_router.get(
     "me", 
-    auth=JWTAuth(), 
+    auth=BrewerJWTAuth(), 
     response={200: UserSchema, codes_4xx: DefaultError},
     url_name="users_me"
 )
@@ -45,7 +45,7 @@ def register(request, user_details: UserRegisterSchema):
 
 @users_router.post(
     "createBrewerProfile", 
-    auth=JWTAuth(), 
+    auth=BrewerJWTAuth(), 
     response={201: BrewerResponseSchema, codes_4xx: DefaultError},
     url_name="users_create_brewer",
 )
@@ -67,10 +67,10 @@ def create_brewer(request, brewer: CreateBrewerSchema):
 
 @users_router.get(
     "profile", 
-    auth=JWTAuth(), 
+    auth=BrewerJWTAuth(), 
     response={200: BrewerResponseSchema, codes_4xx: DefaultError},
     url_name="users_profile"
 )
 @profile_required
 def brewer_profile(request):
-    return request.user.brewer
+    return request.brewer
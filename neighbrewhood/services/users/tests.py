@@ -1,6 +1,9 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
 from django.urls import reverse_lazy
 from requests.status_codes import codes
 
+from services.common.auth import profile_cache
 from services.testing.ServiceTestBase import ServiceTestBase
 
 
@@ -42,3 +45,39 @@ class UsersServicetestCase(ServiceTestBase):
         prof_url = reverse_lazy("api-1.0.0:users_profile")
         prof_r = self.get(prof_url)
         self.assertEqual(prof_r.status_code, codes.ok)
+
+
+    def test_profile_loaded_with_user(self):
+        self.register_user()
+        self.obtain_access_token()
+        crt_brewer_url = reverse_lazy("api-1.0.0:users_create_brewer")
+        self.post(crt_brewer_url, self.brewer_details)
+
+        prof_url = reverse_lazy("api-1.0.0:users_profile")
+        with self.assertNumQueries(1):
+            prof_r = self.get(prof_url)
+        self.assertEqual(prof_r.status_code, codes.ok)
+
+    @override_settings(BREWER_PROFILE_CACHE_TTL=60)
+    def test_profile_cache(self):
+        self.addCleanup(profile_cache.clear)
+        self.register_user()
+        self.obtain_access_token()
+        prof_url = reverse_lazy("api-1.0.0:users_profile")
+        self.assertEqual(self.get(prof_url).status_code, codes.not_found)
+
+        # Creating the profile invalidates the cached "no brewer" lookup
+        crt_brewer_url = reverse_lazy("api-1.0.0:users_create_brewer")
+        self.post(crt_brewer_url, self.brewer_details)
+        self.assertEqual(self.get(prof_url).status_code, codes.ok)
+
+        with self.assertNumQueries(0):
+            prof_r = self.get(prof_url)
+        self.assertEqual(prof_r.status_code, codes.ok)
+
+        # Each request gets its own user and brewer, so one request's changes stay its own
+        user_id = get_user_model().objects.get(username=self.username).id
+        first, second = profile_cache.get(user_id), profile_cache.get(user_id)
+        self.assertIsNot(first.brewer, second.brewer)
+        first.brewer.phone_number = "+15405550000"
+        self.assertNotEqual(second.brewer.phone_number, "+15405550000")